@@ -0,0 +1,176 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_file, load_manifest, save_manifest
+from output import temp_path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl that makes a file share another's blocks copy-on-write (btrfs, XFS)
+FICLONE = 0x40049409
+
+# Ways of putting a file into the output, in the order "auto" tries them. A
+# hardlinked output shares its bytes with the source, so anything editing the
+# output in place has to replace the file rather than write into it.
+METHODS = ("reflink", "hardlink", "copy")
+
+
+def find_static_files(static_dir):
+    # Relative paths of every file under static_dir, in a stable order
+    paths = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            paths.append(os.path.relpath(os.path.join(root, name), static_dir))
+    return paths
+
+
+def reflink(source, dest):
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, dest)
+
+
+def place_file(source, dest, methods, unsupported):
+    # Puts source at dest with the first method that works and returns its
+    # name. Goes through a temporary file so that dest is never written in
+    # place: it may be a hardlink to a source file.
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    # Unique, a plain dest + ".tmp" could be another static file
+    tmp_path = temp_path(dest)
+    for method in methods:
+        if method in unsupported:
+            continue
+        try:
+            if method == "reflink":
+                reflink(source, tmp_path)
+            elif method == "hardlink":
+                os.link(source, tmp_path)
+            else:
+                shutil.copy2(source, tmp_path)
+        except OSError:
+            if method == "copy":
+                raise
+            # Most likely the filesystem can't do it, so don't try it again
+            # this sync
+            unsupported.add(method)
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            continue
+        os.replace(tmp_path, dest)
+        return method
+    raise ValueError(f"no usable copy method in {methods}")
+
+
+def same_stat(stat, old_entry):
+    return (old_entry is not None and old_entry.get("size") == stat.st_size
+            and old_entry.get("mtime_ns") == stat.st_mtime_ns)
+
+
+def sync_file(source, dest, old_entry, methods, unsupported):
+    # Returns the source's manifest entry, the method used to place it, None
+    # when dest was already up to date, and whether the output changed since
+    # the last sync
+    stat = os.stat(source)
+    # Whether the source changed is decided against the manifest, never
+    # against dest: a hardlinked dest is the source, so editing the source in
+    # place leaves the two looking identical. So every entry keeps the
+    # source's hash, worked out again only when its size or mtime moved.
+    unchanged = same_stat(stat, old_entry)
+    digest = old_entry.get("hash") if unchanged else None
+    if digest is None:
+        digest = hash_file(source)
+    edited = old_entry is not None and not unchanged and digest != old_entry.get("hash")
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        dest_stat = None
+
+    # Size and mtime first, every method keeps the mtime. Files that only
+    # differ in mtime are compared by hash.
+    if dest_stat is None or dest_stat.st_size != stat.st_size:
+        up_to_date = False
+    elif dest_stat.st_mtime_ns == stat.st_mtime_ns:
+        up_to_date = True
+    else:
+        up_to_date = hash_file(dest) == digest
+        if up_to_date:
+            # Same bytes, so fix the mtime up and skip the hash next time
+            os.utime(dest, ns=(dest_stat.st_atime_ns, stat.st_mtime_ns))
+
+    method = None if up_to_date else place_file(source, dest, methods, unsupported)
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+    return entry, method, edited or method is not None
+
+
+def sync_static(static_dir, dest_dir, cache_dir, method="auto", workers=None):
+    # Mirrors static_dir into dest_dir, copying only files that changed and
+    # removing the ones that were deleted. method is "reflink", "hardlink",
+    # "copy" or "auto" for the first of those the filesystem supports. Files
+    # are independent, so they are copied by a pool of workers threads; the
+    # copying itself happens outside the GIL.
+    if method != "auto" and method not in METHODS:
+        raise ValueError(f"unknown copy method: {method}")
+    started = time.perf_counter()
+    methods = METHODS if method == "auto" else (method,)
+    manifest_path = os.path.join(cache_dir, "assets.json")
+    old_manifest = load_manifest(manifest_path, "files")
+    old_files = old_manifest["files"] if old_manifest is not None else {}
+    unsupported = set()
+
+    rel_paths = find_static_files(static_dir) if os.path.isdir(static_dir) else []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda rel_path: sync_file(os.path.join(static_dir, rel_path),
+                                       os.path.join(dest_dir, rel_path),
+                                       old_files.get(rel_path), methods, unsupported),
+            rel_paths,
+        ))
+
+    files = {}
+    report = {"files": len(rel_paths), "copied": 0, "skipped": 0, "removed": 0,
+              "bytes_copied": 0, "bytes_skipped": 0, "methods": dict.fromkeys(METHODS, 0),
+              "changed_files": [], "removed_files": []}
+    for rel_path, (entry, used, changed) in zip(rel_paths, results):
+        files[rel_path] = entry
+        if used is None:
+            report["skipped"] += 1
+            report["bytes_skipped"] += entry["size"]
+        else:
+            report["copied"] += 1
+            report["bytes_copied"] += entry["size"]
+            report["methods"][used] += 1
+        # Also a linked output that changed along with its source
+        if changed:
+            report["changed_files"].append(rel_path)
+
+    # Only files this stage put there, the rest of dest_dir is the pages
+    for rel_path in old_files:
+        if rel_path not in files:
+            try:
+                os.remove(os.path.join(dest_dir, rel_path))
+            except FileNotFoundError:
+                continue
+            report["removed"] += 1
+            report["removed_files"].append(rel_path)
+
+    save_manifest(manifest_path, {"files": files})
+    report["elapsed"] = time.perf_counter() - started
+    return report
+
+
+def print_asset_report(report):
+    methods = ", ".join(f"{count} {name}" for name, count in report["methods"].items() if count)
+    print(f"Synced {report['files']} static files in {report['elapsed'] * 1000:.1f} ms: "
+          f"{report['copied']} copied ({methods or 'none'}), {report['skipped']} skipped, "
+          f"{report['removed']} removed")
+    print(f"  {report['bytes_copied']} bytes copied, {report['bytes_skipped']} bytes skipped")
@@ -0,0 +1,437 @@
+import multiprocessing
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from textnode import TextNode, TextType
+from patterns import PATTERNS, PATTERN_SOURCES
+from htmlnode import LeafNode, ParentNode
+from blocknode import BlockType
+from template import Template
+from build import render_pages
+from corpus import small_page
+from main import (
+    block_to_block_type,
+    iter_markdown_file_blocks,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    split_nodes_delimiter,
+    text_node_to_html_node,
+    text_nodes_to_html_nodes,
+    text_to_textnodes,
+)
+
+
+def time_call(func, *args, repeat=3):
+    # Best of a few runs, in seconds
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_split_nodes_delimiter():
+    # Time per pair should stay flat as the number of pairs grows
+    print(f"{'pairs':>10} {'total ms':>10} {'ns/pair':>10}")
+    for count in (1000, 10000, 100000, 1000000):
+        node = TextNode("a **b** " * count, TextType.TEXT)
+        elapsed = time_call(split_nodes_delimiter, [node], "**", TextType.BOLD)
+        print(f"{count:>10} {elapsed * 1000:>10.1f} {elapsed / count * 1e9:>10.1f}")
+
+
+def bench_regex():
+    # Per-call overhead of re.findall(raw string) against a precompiled pattern
+    text = "A short line with an ![image](https://example.com/a.png) and a [link](https://example.com)"
+    calls = 100000
+
+    def raw_calls():
+        source = PATTERN_SOURCES["image"]
+        for _ in range(calls):
+            re.findall(source, text)
+
+    def compiled_calls():
+        pattern = PATTERNS["image"]
+        for _ in range(calls):
+            pattern.findall(text)
+
+    raw = time_call(raw_calls)
+    compiled = time_call(compiled_calls)
+    print(f"{'re.findall(raw)':<20} {raw / calls * 1e9:>8.1f} ns/call")
+    print(f"{'compiled.findall':<20} {compiled / calls * 1e9:>8.1f} ns/call")
+
+
+def build_wide_tree(sections, leaves):
+    # sections * leaves leaf nodes under two levels of parents
+    return ParentNode("div", [
+        ParentNode("p", [LeafNode("b", f"leaf {i}") for i in range(leaves)])
+        for _ in range(sections)
+    ])
+
+
+def concat_to_html(node):
+    # The old ParentNode.to_html, building the output with +=
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    node_str = ""
+    for child in node.children:
+        node_str += concat_to_html(child)
+    return f"<{node.tag}>{node_str}</{node.tag}>"
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_html_render(mode, sections, leaves):
+    tree = build_wide_tree(sections, leaves)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "concat":
+        concat_to_html(tree)
+    elif mode == "to_html":
+        tree.to_html()
+    else:
+        with tempfile.TemporaryFile("w") as sink:
+            tree.write_html(sink)
+    elapsed = time.perf_counter() - start
+    return elapsed, rss_before, peak_rss_mb()
+
+
+def run_isolated(func, *args):
+    # Fresh interpreter per run so peak RSS is not shared between runs
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def bench_html_stream():
+    sections, leaves = 1000, 1000
+    print(f"{sections * leaves} leaf nodes")
+    print(f"{'mode':<12} {'seconds':>8} {'tree MB':>8} {'peak MB':>8} {'render MB':>10}")
+    for mode in ("concat", "to_html", "write_html"):
+        elapsed, before, after = run_isolated(run_html_render, mode, sections, leaves)
+        print(f"{mode:<12} {elapsed:>8.2f} {before:>8.0f} {after:>8.0f} {after - before:>10.0f}")
+
+
+def recursive_iter_html(node):
+    # The previous recursive iter_html, one generator frame per level
+    if not isinstance(node, ParentNode):
+        yield node.to_html()
+        return
+    yield node.open_tag()
+    for child in node.children:
+        yield from recursive_iter_html(child)
+    yield f"</{node.tag}>"
+
+
+def build_deep_tree(depth):
+    node = LeafNode("b", "deep")
+    for _ in range(depth):
+        node = ParentNode("div", [node])
+    return node
+
+
+def bench_html_depth():
+    # Deep chains and wide trees, recursive generator against the explicit stack
+    cases = [("depth", depth, build_deep_tree(depth)) for depth in (100, 900, 10000, 100000)]
+    cases += [("width", width, build_wide_tree(1, width)) for width in (1000, 100000, 1000000)]
+    print(f"{'shape':<6} {'size':>8} {'recursive ms':>13} {'stack ms':>9}")
+    for shape, size, tree in cases:
+        try:
+            recursive = f"{time_call(lambda: ''.join(recursive_iter_html(tree))) * 1000:.1f}"
+        except RecursionError:
+            recursive = "overflow"
+        stack = time_call(tree.to_html) * 1000
+        print(f"{shape:<6} {size:>8} {recursive:>13} {stack:>9.1f}")
+
+
+class DictTextNode:
+    # TextNode as it was before __slots__
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    # LeafNode as it was before __slots__
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def allocated_bytes(build):
+    # Bytes still allocated by the objects build() returns
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def bench_node_memory():
+    text = "Some plain text with **bold**, _italic_, `code` and a [link](https://example.com) " * 50000
+    text_nodes = text_to_textnodes(text)
+    leaves = [text_node_to_html_node(node) for node in text_nodes]
+    count = len(text_nodes)
+    print(f"{count} inline nodes")
+
+    rows = [
+        ("TextNode dict", lambda: [DictTextNode(n.text, n.text_type, n.url) for n in text_nodes]),
+        ("TextNode slots", lambda: [TextNode(n.text, n.text_type, n.url) for n in text_nodes]),
+        ("LeafNode dict", lambda: [DictLeafNode(n.tag, n.value, n.props) for n in leaves]),
+        ("LeafNode slots", lambda: [LeafNode(n.tag, n.value, n.props) for n in leaves]),
+    ]
+    print(f"{'class':<16} {'bytes/node':>10}")
+    for name, build in rows:
+        size, _ = allocated_bytes(build)
+        print(f"{name:<16} {size / count:>10.1f}")
+
+
+def traced_peak(func, *args):
+    # Peak bytes allocated while func runs
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench_blocks_memory():
+    # Whole-document split against the streaming splitter, by file size
+    block = "A paragraph line with some **bold** text\nand a second line\n\n"
+    print(f"{'file MB':>8} {'split MB':>9} {'stream MB':>10} {'mmap MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "big.md")
+        for repeat in (10000, 100000, 500000):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(block * repeat)
+            size = os.path.getsize(path)
+
+            def split_whole():
+                with open(path, encoding="utf-8", newline="\n") as f:
+                    for _ in markdown_to_blocks(f.read()):
+                        pass
+
+            def stream(use_mmap):
+                for _ in iter_markdown_file_blocks(path, use_mmap=use_mmap):
+                    pass
+
+            mb = 1024 * 1024
+            print(f"{size / mb:>8.1f} {traced_peak(split_whole) / mb:>9.1f} "
+                  f"{traced_peak(stream, False) / mb:>10.2f} {traced_peak(stream, True) / mb:>8.2f}")
+
+
+def multi_pass_block_type(block):
+    # The earlier classifier: a pass per candidate type and an f-string per line
+    if block.startswith('#'):
+        count = len(block) - len(block.lstrip('#'))
+        if 1 <= count <= 6 and block[count:count + 1] == ' ':
+            return BlockType.HEADING
+    if block.startswith('```') and block.rstrip().endswith('```'):
+        return BlockType.CODE
+    lines = block.split('\n')
+    if all(line.startswith('>') for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith('- ') for line in lines):
+        return BlockType.ULIST
+    for i, line in enumerate(lines, 1):
+        if not line.startswith(f"{i}. "):
+            return BlockType.PARAGRAPH
+    return BlockType.OLIST
+
+
+def bench_block_type():
+    lines = 100000
+    cases = [
+        ("quote", "\n".join("> quoted line of text" for _ in range(lines))),
+        ("ulist", "\n".join("- list item" for _ in range(lines))),
+        ("olist", "\n".join(f"{i}. list item" for i in range(1, lines + 1))),
+        ("paragraph", "\n".join("plain paragraph line" for _ in range(lines))),
+        ("broken olist", "\n".join(f"{i}. list item" for i in range(1, lines)) + "\nnot an item"),
+    ]
+    print(f"{lines} lines per block")
+    print(f"{'block':<14} {'multi-pass ms':>14} {'single-scan ms':>15}")
+    for name, block in cases:
+        assert multi_pass_block_type(block) == block_to_block_type(block)
+        before = time_call(multi_pass_block_type, block) * 1000
+        after = time_call(block_to_block_type, block) * 1000
+        print(f"{name:<14} {before:>14.2f} {after:>15.2f}")
+
+
+def bench_markdown_to_html():
+    # Whole documents per second, by kind of content
+    prose = "# Title\n\n" + "A paragraph with **bold**, _italic_ and a [link](https://example.com).\n\n" * 50
+    code = "# Title\n\n" + ("```\n" + "x = compute(**kwargs) [not](a link)\n" * 50 + "```\n\n") * 10
+    lists = "# Title\n\n" + "\n".join(f"{i}. item **{i}**" for i in range(1, 101)) + "\n\n" \
+        + "\n".join("- item `code`" for _ in range(100)) + "\n\n" \
+        + "\n".join("> quoted _line_" for _ in range(100))
+    print(f"{'document':<10} {'KB':>6} {'parse docs/s':>13} {'to_html docs/s':>15}")
+    for name, md in (("prose", prose), ("code", code), ("lists", lists)):
+        docs = 200
+        parse = time_call(lambda: [markdown_to_html_node(md) for _ in range(docs)])
+        full = time_call(lambda: [markdown_to_html_node(md).to_html() for _ in range(docs)])
+        print(f"{name:<10} {len(md) / 1024:>6.1f} {docs / parse:>13.0f} {docs / full:>15.0f}")
+
+
+def match_text_node_to_html_node(text_node):
+    # The converter before TEXT_NODE_CONVERTERS, for comparison
+    match text_node.text_type:
+        case TextType.TEXT:
+            return LeafNode(tag=None, value=text_node.text)
+        case TextType.BOLD:
+            return LeafNode(tag="b", value=text_node.text)
+        case TextType.ITALIC:
+            return LeafNode(tag="i", value=text_node.text)
+        case TextType.CODE:
+            return LeafNode(tag="code", value=text_node.text)
+        case TextType.LINK:
+            return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
+        case TextType.IMAGE:
+            return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
+        case _:
+            raise Exception(f"Invalid type: {text_node.text_type}")
+
+
+def bench_inline_nodes():
+    # Converting millions of inline nodes, from a document whose spans repeat
+    # a lot like real prose does and from one where no two are equal
+    repeated = "Some plain text with **bold**, _italic_, `code` and a [link](https://example.com) "
+    unique = " ".join(f"word{i} **bold{i}** _italic{i}_ `code{i}` [link](https://example.com/{i})"
+                      for i in range(125000))
+    print(f"{'document':<10} {'nodes':>8} {'match ms':>9} {'table ms':>9} {'batch ms':>9} "
+          f"{'match MB':>9} {'batch MB':>9}")
+    for name, text in (("repeated", repeated * 125000), ("unique", unique)):
+        text_nodes = text_to_textnodes(text, single_pass=True)
+        cases = (
+            lambda: [match_text_node_to_html_node(node) for node in text_nodes],
+            lambda: [text_node_to_html_node(node) for node in text_nodes],
+            lambda: text_nodes_to_html_nodes(text_nodes),
+        )
+        match, table, batch = (time_call(case) * 1000 for case in cases)
+        match_size, _ = allocated_bytes(cases[0])
+        batch_size, _ = allocated_bytes(cases[2])
+        print(f"{name:<10} {len(text_nodes):>8} {match:>9.0f} {table:>9.0f} {batch:>9.0f} "
+              f"{match_size / 2**20:>9.0f} {batch_size / 2**20:>9.0f}")
+
+
+def bench_template():
+    # Filling the page layout in, by size of the layout and of the content
+    pages = 2000
+    print(f"{pages} pages")
+    print(f"{'layout KB':>9} {'content KB':>10} {'replace ms':>11} {'compiled ms':>12}")
+    for layout_size, chunks in ((1, 10), (50, 10), (50, 1000)):
+        padding = "<nav>" + "x" * 1000 + "</nav>\n"
+        source = ("<html><head><title>{{ Title }}</title></head>\n" + padding * layout_size
+                  + "<article>{{ Content }}</article>\n" + padding * layout_size + "</html>")
+        content = ["<p>paragraph of text</p>"] * chunks
+        template = Template(source)
+
+        def replace():
+            for _ in range(pages):
+                source.replace("{{ Title }}", "Title").replace("{{ Content }}", "".join(content))
+
+        def compiled():
+            for _ in range(pages):
+                template.render({"Title": "Title", "Content": content})
+
+        assert template.render({"Title": "Title", "Content": content}) == \
+            source.replace("{{ Title }}", "Title").replace("{{ Content }}", "".join(content))
+        before = time_call(replace) * 1000
+        after = time_call(compiled) * 1000
+        content_kb = len("".join(content)) / 1024
+        print(f"{len(source) / 1024:>9.0f} {content_kb:>10.1f} {before:>11.1f} {after:>12.1f}")
+
+
+def bench_build_scaling():
+    # Pages per second rendering the same small pages with 1 to N workers
+    pages = 4000
+    cores = os.cpu_count() or 1
+    rng = random.Random(0)
+    template = Template("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = [os.path.join(tmp, f"page{i}.md") for i in range(pages)]
+        dests = [os.path.join(tmp, "public", f"page{i}.html") for i in range(pages)]
+        for source in sources:
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(small_page(rng))
+
+        print(f"{pages} pages, {cores} CPUs")
+        print(f"{'workers':>7} {'pages/s':>9} {'speedup':>8} {'efficiency':>11}")
+        single = None
+        counts = sorted({1, *range(2, cores + 1, max(1, cores // 8)), cores})
+        for workers in counts:
+            elapsed = time_call(render_pages, sources, dests, template, workers, repeat=1)
+            if single is None:
+                single = elapsed
+            speedup = single / elapsed
+            print(f"{workers:>7} {pages / elapsed:>9.0f} {speedup:>8.2f} {speedup / workers:>11.2f}")
+
+
+# Commands timed by the startup benchmark, run from this directory
+STARTUP_COMMANDS = (
+    ("python -c pass", ["-c", "pass"]),
+    ("cli.py --help", ["cli.py", "--help"]),
+    ("import main", ["-c", "import main"]),
+    ("import build", ["-c", "import build"]),
+    ("import watch", ["-c", "import watch"]),
+    ("import bench", ["-c", "import bench"]),
+)
+
+
+def bench_startup():
+    # Wall time of a fresh interpreter running each command, and how much of
+    # it is spent on top of the bare interpreter starting up
+    src = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'command':<16} {'ms':>8} {'over python ms':>15}")
+    bare = None
+    for name, args in STARTUP_COMMANDS:
+        elapsed = time_call(lambda: subprocess.run([sys.executable] + args, cwd=src, check=True,
+                                                   stdout=subprocess.DEVNULL), repeat=10)
+        if bare is None:
+            bare = elapsed
+        print(f"{name:<16} {elapsed * 1000:>8.1f} {(elapsed - bare) * 1000:>15.1f}")
+
+
+BENCHMARKS = {
+    "split_nodes_delimiter": bench_split_nodes_delimiter,
+    "regex": bench_regex,
+    "html_stream": bench_html_stream,
+    "html_depth": bench_html_depth,
+    "node_memory": bench_node_memory,
+    "blocks_memory": bench_blocks_memory,
+    "block_type": bench_block_type,
+    "markdown_to_html": bench_markdown_to_html,
+    "inline_nodes": bench_inline_nodes,
+    "template": bench_template,
+    "build_scaling": bench_build_scaling,
+    "startup": bench_startup,
+}
+
+
+def main(names=None):
+    if names is None:
+        names = sys.argv[1:]
+    names = names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise SystemExit(f"unknown benchmark: {name}")
+        print(f"== {name}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from corpus import generate_corpus
+from htmlnode import ParentNode
+from main import block_to_block_type, markdown_to_blocks, markdown_to_html_node, text_to_textnodes
+
+# A result slower or bigger than the baseline by more than this is flagged
+DEFAULT_THRESHOLD = 0.2
+
+
+def workload_cases(workload):
+    # (function name, callable) pairs measured for one workload
+    documents = workload["documents"]
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    if workload["tree"] is not None:
+        tree = workload["tree"]
+    else:
+        tree = ParentNode("body", [markdown_to_html_node(document) for document in documents])
+
+    cases = []
+    if documents:
+        cases += [
+            ("markdown_to_blocks", lambda: [markdown_to_blocks(d) for d in documents]),
+            ("block_to_block_type", lambda: [block_to_block_type(b) for b in blocks]),
+            ("text_to_textnodes", lambda: [text_to_textnodes(b) for b in blocks]),
+            ("text_to_textnodes_single_pass",
+             lambda: [text_to_textnodes(b, single_pass=True) for b in blocks]),
+            ("markdown_to_html_node", lambda: [markdown_to_html_node(d) for d in documents]),
+        ]
+    cases.append(("ParentNode.to_html", tree.to_html))
+    return cases
+
+
+def measure(func, repeat):
+    # Best wall time of repeat runs, then one traced run for peak memory
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run_suite(seed=0, scale=1.0, repeat=3, workloads=None):
+    corpus = generate_corpus(seed, scale)
+    results = {}
+    for name, workload in corpus.items():
+        if workloads and name not in workloads:
+            continue
+        for function, func in workload_cases(workload):
+            results[f"{name}/{function}"] = measure(func, repeat)
+    return {
+        "meta": {
+            "seed": seed,
+            "scale": scale,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    # Returns rows of (key, metric, baseline, current, ratio, regressed) for
+    # every result present in both runs
+    rows = []
+    for key, result in current["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if not old.get(metric):
+                continue
+            ratio = result[metric] / old[metric]
+            rows.append((key, metric, old[metric], result[metric], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_results(report):
+    print(f"{'benchmark':<52} {'ms':>10} {'peak KB':>10}")
+    for key, result in report["results"].items():
+        print(f"{key:<52} {result['seconds'] * 1000:>10.2f} {result['peak_bytes'] / 1024:>10.0f}")
+
+
+def print_comparison(rows):
+    print(f"{'benchmark':<52} {'metric':<10} {'ratio':>7}")
+    for key, metric, _, _, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<52} {metric:<10} {ratio:>7.2f}{flag}")
+
+
+def run_and_compare(seed=0, scale=1.0, repeat=3, workloads=None, output=None, baseline=None,
+                    threshold=DEFAULT_THRESHOLD):
+    # Runs the suite, stores it in output and compares it with the results
+    # stored in baseline. Returns 1 when something regressed, else 0.
+    report = run_suite(seed, scale, repeat, workloads)
+    print_results(report)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        rows = compare(report, stored, threshold)
+        print()
+        print_comparison(rows)
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # The command line is "cli.py bench --suite"; this keeps
+    # "python3 src/benchsuite.py" working
+    from cli import main
+    sys.exit(main(["bench", "--suite"] + sys.argv[1:]))
@@ -0,0 +1,134 @@
+import hashlib
+import importlib
+import os
+import sqlite3
+import time
+
+# Modules whose source decides how a block is rendered
+PARSER_MODULES = ("main", "htmlnode", "textnode", "blocknode", "patterns")
+
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def parser_version():
+    # Hash of the parser's own source, so any change to it invalidates the
+    # cache without anyone having to remember to bump a number
+    digest = hashlib.sha256()
+    for name in PARSER_MODULES:
+        with open(importlib.import_module(name).__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def block_key(block):
+    return hashlib.sha256(block.encode("utf-8")).hexdigest()
+
+
+class BlockCache:
+    # Persistent map from a block's content hash to its rendered HTML,
+    # bounded to max_entries with least recently used eviction. Safe to open
+    # from several worker processes at once. Eviction runs when evict() or
+    # close() is called, so the bound is only checked once per batch of
+    # pages, and each process only counts its own additions towards it.
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, version=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Pending writes, flushed in one transaction
+        self.used = {}
+        self.added = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, html TEXT, used REAL)"
+            )
+            # Eviction picks the least recently used rows by this
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            if version is None:
+                version = parser_version()
+            row = self.connection.execute(
+                "SELECT value FROM meta WHERE name = 'version'"
+            ).fetchone()
+            if row is None or row[0] != version:
+                self.connection.execute("DELETE FROM blocks")
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,)
+                )
+        # At most this many rows, counting only what this process added, so
+        # the table is counted again only once it may be over max_entries
+        self.rows = self.count()
+
+    def get(self, block):
+        key = block_key(block)
+        html = self.added.get(key)
+        if html is None:
+            row = self.connection.execute(
+                "SELECT html FROM blocks WHERE key = ?", (key,)
+            ).fetchone()
+            html = row[0] if row else None
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used[key] = time.time()
+        return html
+
+    def put(self, block, html):
+        self.added[block_key(block)] = html
+
+    def render(self, block, render_block):
+        # render_block(block) returns the block's HTML and runs only on a miss
+        html = self.get(block)
+        if html is None:
+            html = render_block(block)
+            self.put(block, html)
+        return html
+
+    def flush(self):
+        if not self.used and not self.added:
+            return
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE blocks SET used = ? WHERE key = ?",
+                [(used, key) for key, used in self.used.items()],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO blocks VALUES (?, ?, ?)",
+                [(key, html, now) for key, html in self.added.items()],
+            )
+        self.rows += len(self.added)
+        self.used.clear()
+        self.added.clear()
+
+    def evict(self):
+        if self.rows <= self.max_entries:
+            return
+        self.rows = self.count()
+        excess = self.rows - self.max_entries
+        if excess > 0:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM blocks WHERE key IN "
+                    "(SELECT key FROM blocks ORDER BY used ASC LIMIT ?)",
+                    (excess,),
+                )
+            self.rows = self.max_entries
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self.evict()
+        self.connection.close()
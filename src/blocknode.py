@@ -1,6 +1,9 @@
 from enum import Enum
 
 class BlockType(Enum):
+    # Hashed by identity like TextType, BLOCK_RENDERERS is keyed on these
+    __hash__ = object.__hash__
+
     PARAGRAPH = "paragraph"
     HEADING = "heading"
     CODE = "code"
@@ -0,0 +1,406 @@
+import os
+import time
+
+from main import markdown_to_blocks, block_to_html_node, extract_title
+from blockcache import BlockCache, DEFAULT_MAX_ENTRIES, parser_version
+from manifest import empty_manifest, hash_bytes, hash_file, load_manifest, save_manifest
+from output import DEFAULT_CONCURRENCY, write_pages
+from template import Template
+
+# Bump when a change to the generator alters its output, so that the next
+# incremental build re-renders every page
+GENERATOR_VERSION = "2"
+
+# Stages timed for every page, in pipeline order
+STAGES = ("read", "cache", "parse", "serialize", "template", "write")
+
+# Most pages a worker holds in memory before writing them out together
+MAX_BATCH = 256
+
+# Template, block cache, profiler and write concurrency of the current worker
+# process, see init_worker
+worker_template = None
+worker_cache = None
+worker_profiler = None
+worker_concurrency = DEFAULT_CONCURRENCY
+
+
+def find_markdown_files(content_dir):
+    # Relative paths of every .md file under content_dir, in a stable order
+    paths = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".md"):
+                paths.append(os.path.relpath(os.path.join(root, name), content_dir))
+    return paths
+
+
+def page_output_path(dest_dir, rel_path):
+    return os.path.join(dest_dir, os.path.splitext(rel_path)[0] + ".html")
+
+
+def read_source(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def render_page(source_path, template, block_cache=None):
+    # Converts one markdown file into an HTML page laid out by template, a
+    # Template. Returns the page as bytes, seconds per stage and how many
+    # blocks came from block_cache. Writing the page is up to the caller.
+    timings = dict.fromkeys(STAGES, 0.0)
+    hits = misses = 0
+
+    start = time.perf_counter()
+    markdown = read_source(source_path)
+    timings["read"] = time.perf_counter() - start
+
+    # Same output as markdown_to_html_node(markdown).to_html(), one block at
+    # a time so that each block's HTML can be cached
+    chunks = ["<div>"]
+    for block in markdown_to_blocks(markdown):
+        if block_cache is not None:
+            start = time.perf_counter()
+            html = block_cache.get(block)
+            timings["cache"] += time.perf_counter() - start
+            if html is not None:
+                hits += 1
+                chunks.append(html)
+                continue
+            misses += 1
+
+        start = time.perf_counter()
+        node = block_to_html_node(block)
+        timings["parse"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        html = node.to_html()
+        timings["serialize"] += time.perf_counter() - start
+        chunks.append(html)
+
+        if block_cache is not None:
+            block_cache.put(block, html)
+    chunks.append("</div>")
+
+    start = time.perf_counter()
+    try:
+        title = extract_title(markdown)
+    except Exception as error:
+        # Otherwise nothing says which of the pages has no title
+        raise Exception(f"{source_path}: {error}") from error
+    timings["parse"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    page = template.render({"Title": title, "Content": chunks}).encode("utf-8")
+    timings["template"] = time.perf_counter() - start
+
+    if block_cache is not None:
+        start = time.perf_counter()
+        block_cache.flush()
+        timings["cache"] += time.perf_counter() - start
+
+    return {"page": page, "timings": timings, "cache_hits": hits, "cache_misses": misses}
+
+
+def init_worker(template, cache_path, cache_size, profile=None, memory_limit=None,
+                concurrency=DEFAULT_CONCURRENCY):
+    # Each process gets the compiled template once, opens its own connection
+    # to the shared block cache and, when profile is a (per_page, trace)
+    # pair, profiles its own pages. memory_limit caps the process's address
+    # space in bytes, so one huge page fails with MemoryError instead of
+    # using up the machine's memory. concurrency is how many pages it writes
+    # at once.
+    global worker_template, worker_cache, worker_profiler, worker_concurrency
+    if memory_limit is not None:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    worker_template = template
+    worker_concurrency = concurrency
+    if worker_cache is not None:
+        worker_cache.close()
+    worker_cache = BlockCache(cache_path, cache_size) if cache_path else None
+
+    if worker_profiler is None and profile is None:
+        return
+    # Only imported when profiling, like the process pool in render_pages
+    import instrument
+    if worker_profiler is not None:
+        instrument.uninstrument()
+        worker_profiler = None
+    if profile is not None:
+        per_page, trace = profile
+        worker_profiler = instrument.Profiler(per_page=per_page, trace=trace)
+        instrument.instrument(worker_profiler)
+
+
+def output_stat(path):
+    # Size and mtime of an output, to tell whether it's still the file the
+    # last build left there
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def known_output(entry):
+    # The output hash, size and mtime the last build recorded for a page
+    if entry is None or "output_hash" not in entry:
+        return None
+    return [entry["output_hash"], entry.get("output_size"), entry.get("output_mtime_ns")]
+
+
+def profiled_writer(profiler, sources):
+    # Writes in the output stage's threads, charging each write to the page
+    # it came from. sources maps each output to its source.
+    import output
+
+    def write(path, data):
+        with profiler.on_page(sources[path]):
+            # Looked up on each call so it's the instrumented version
+            return output.write_if_changed(path, data)
+
+    return write
+
+
+def render_worker_pages(sources, dests, outputs):
+    # Renders a batch of pages and writes the ones that changed all at once
+    # through the async output stage. A page whose hash matches its output
+    # from the last build, see known_output, is not written, or even
+    # compared with the file on disk, as long as that file still has the
+    # recorded size and mtime. Returns a small result per page, with the
+    # page's hash and its output's stat instead of the page.
+    results = [render_page(source, worker_template, worker_cache) for source in sources]
+    if worker_cache is not None:
+        # Once per batch, it's the only part of the cache that scans the table
+        start = time.perf_counter()
+        worker_cache.evict()
+        share = (time.perf_counter() - start) / max(1, len(results))
+        for result in results:
+            result["timings"]["cache"] += share
+    pending = []
+    for dest, output, result in zip(dests, outputs, results):
+        page = result.pop("page")
+        result["hash"] = hash_bytes(page)
+        result["written"] = False
+        if output is None or output[0] != result["hash"] or output_stat(dest) != output[1:]:
+            pending.append((dest, page, result))
+
+    write = None
+    if worker_profiler is not None:
+        write = profiled_writer(worker_profiler, dict(zip(dests, sources)))
+    start = time.perf_counter()
+    sizes = write_pages([(dest, page) for dest, page, _ in pending], worker_concurrency, write)
+    for (_, _, result), size in zip(pending, sizes):
+        result["written"] = size is not None
+    # The writes overlap, so each page is charged an equal share of them
+    share = (time.perf_counter() - start) / max(1, len(results))
+    for dest, result in zip(dests, results):
+        result["timings"]["write"] = share
+        result["output"] = output_stat(dest)
+
+    batch = {"results": results}
+    if worker_profiler is not None:
+        batch["profile"] = worker_profiler.drain()
+    return batch
+
+
+def default_cache_dir(dest_dir):
+    # Kept next to the output directory so it is never deployed with it
+    return os.path.join(os.path.dirname(os.path.abspath(dest_dir)), ".build-cache")
+
+
+def pool_size(workers, tasks):
+    # None means one worker per CPU, and there's never more workers than tasks
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, tasks or 1))
+
+
+def batches(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def render_pages(sources, dests, template, workers=None, cache_path=None,
+                 cache_size=DEFAULT_MAX_ENTRIES, profiler=None, memory_limit=None, chunksize=None,
+                 concurrency=DEFAULT_CONCURRENCY, outputs=None, mp_context=None):
+    # Renders each source file into the dest at the same index, sharded over
+    # a pool of workers processes that share nothing but the block cache.
+    # Pages are handed out chunksize at a time to cut down on round trips,
+    # by default about four chunks per worker and never more than MAX_BATCH.
+    # Workers write each chunk themselves, concurrency pages at a time, and
+    # send back only a small result per page, returned in the order of
+    # sources. What the workers profiled is merged into profiler. A
+    # memory_limit in bytes always runs in a pool, so it never applies to
+    # the calling process. outputs are what the last build recorded for each
+    # page, see render_worker_pages. mp_context is how the pool starts its
+    # processes, None is the platform's default.
+    workers = pool_size(workers, len(sources))
+    profile = (profiler.per_page, profiler.trace) if profiler is not None else None
+    if chunksize is None:
+        chunksize = min(MAX_BATCH, max(1, len(sources) // (workers * 4)))
+    if outputs is None:
+        outputs = [None] * len(sources)
+    source_batches = batches(sources, chunksize)
+    dest_batches = batches(dests, chunksize)
+    output_batches = batches(outputs, chunksize)
+
+    if workers == 1 and memory_limit is None:
+        init_worker(template, cache_path, cache_size, profile, None, concurrency)
+        try:
+            rendered = list(map(render_worker_pages, source_batches, dest_batches,
+                                output_batches))
+        finally:
+            init_worker(None, None, None)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        initargs = (template, cache_path, cache_size, profile, memory_limit, concurrency)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                 initializer=init_worker, initargs=initargs) as executor:
+            rendered = list(executor.map(render_worker_pages, source_batches, dest_batches,
+                                         output_batches))
+
+    if profiler is not None:
+        for batch in rendered:
+            profiler.merge(batch["profile"])
+    return [result for batch in rendered for result in batch["results"]]
+
+
+def remove_output(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def build_site(content_dir="content", template_path="template.html", dest_dir="public",
+               workers=None, force=False, cache_dir=None, block_cache=True,
+               block_cache_size=DEFAULT_MAX_ENTRIES, profiler=None, worker_memory_limit=None,
+               write_concurrency=DEFAULT_CONCURRENCY, mp_context=None):
+    # Renders markdown files under content_dir into dest_dir. workers is the
+    # size of the process pool, None uses every CPU and 1 stays in-process;
+    # see render_pages, also for worker_memory_limit, write_concurrency and
+    # mp_context.
+    # Pages whose source, template and generator are unchanged since the last
+    # build are skipped unless force is set. block_cache reuses the HTML of
+    # blocks rendered by earlier builds. An instrument.Profiler passed as
+    # profiler collects what every worker recorded.
+    started = time.perf_counter()
+    with open(template_path, encoding="utf-8") as f:
+        template_source = f.read()
+    # Parsed once here rather than once per page
+    template = Template(template_source)
+
+    if cache_dir is None:
+        cache_dir = default_cache_dir(dest_dir)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    template_hash = hash_bytes(template_source.encode("utf-8"))
+    # The parser's hash too, a change to it changes every page without
+    # GENERATOR_VERSION having to be bumped by hand
+    generator = f"{GENERATOR_VERSION}-{parser_version()}"
+
+    # Loaded even when forced, it's also the list of outputs to remove
+    old_manifest = load_manifest(manifest_path)
+    if old_manifest is None:
+        old_pages = {}
+        full_rebuild = True
+    else:
+        old_pages = old_manifest["pages"]
+        # Every page depends on the template and on the generator itself
+        full_rebuild = (force or old_manifest.get("generator") != generator
+                        or old_manifest.get("template") != template_hash)
+
+    manifest = empty_manifest(generator, template_hash)
+    rel_paths, sources, dests, outputs = [], [], [], []
+    skipped = 0
+    for rel_path in find_markdown_files(content_dir):
+        source = os.path.join(content_dir, rel_path)
+        dest = page_output_path(dest_dir, rel_path)
+        old_entry = old_pages.get(rel_path)
+        stat = os.stat(source)
+        if (old_entry is not None and old_entry.get("mtime_ns") == stat.st_mtime_ns
+                and old_entry.get("size") == stat.st_size):
+            # Unchanged on disk, no need to read it again
+            source_hash = old_entry["hash"]
+        else:
+            source_hash = hash_file(source)
+        manifest["pages"][rel_path] = {
+            "hash": source_hash,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "output": os.path.relpath(dest, dest_dir),
+        }
+
+        # Forced pages are always compared with the file on disk
+        output = None if force else known_output(old_entry)
+        # Skipped only while the output is still the file this build wrote,
+        # not one put back or edited since
+        if (not full_rebuild and output is not None and old_entry.get("hash") == source_hash
+                and output_stat(dest) == output[1:]):
+            manifest["pages"][rel_path].update(
+                output_hash=output[0], output_size=output[1], output_mtime_ns=output[2]
+            )
+            skipped += 1
+            continue
+        rel_paths.append(rel_path)
+        sources.append(source)
+        dests.append(dest)
+        outputs.append(output)
+
+    # Outputs of sources that no longer exist
+    removed_files = []
+    for rel_path, entry in old_pages.items():
+        if rel_path not in manifest["pages"] and "output" in entry:
+            remove_output(os.path.join(dest_dir, entry["output"]))
+            removed_files.append(entry["output"])
+
+    workers = pool_size(workers, len(sources))
+    cache_path = os.path.join(cache_dir, "blocks.sqlite") if block_cache else None
+    results = render_pages(sources, dests, template, workers, cache_path, block_cache_size,
+                           profiler, worker_memory_limit, concurrency=write_concurrency,
+                           outputs=outputs, mp_context=mp_context)
+    changed_files = []
+    for rel_path, result in zip(rel_paths, results):
+        entry = manifest["pages"][rel_path]
+        entry["output_hash"] = result["hash"]
+        if result["output"] is not None:
+            entry["output_size"], entry["output_mtime_ns"] = result["output"]
+        if result["written"]:
+            changed_files.append(entry["output"])
+
+    # Only recorded once every page has been written
+    save_manifest(manifest_path, manifest)
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    for result in results:
+        for stage, seconds in result["timings"].items():
+            timings[stage] += seconds
+
+    return {
+        "pages": len(manifest["pages"]),
+        "rebuilt": len(results),
+        # Rebuilt, but came out the same as the page already on disk
+        "unchanged": sum(not result["written"] for result in results),
+        "skipped": skipped,
+        "removed": len(removed_files),
+        # Outputs relative to dest_dir, for deploy tooling to upload or delete
+        "changed_files": changed_files,
+        "removed_files": removed_files,
+        "workers": workers,
+        "cache_hits": sum(result["cache_hits"] for result in results),
+        "cache_misses": sum(result["cache_misses"] for result in results),
+        "timings": timings,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def print_report(report):
+    print(f"Built {report['pages']} pages with {report['workers']} workers "
+          f"in {report['elapsed'] * 1000:.1f} ms: {report['rebuilt']} rebuilt "
+          f"({report['unchanged']} unchanged on disk), {report['skipped']} skipped, "
+          f"{report['removed']} removed")
+    print(f"Block cache: {report['cache_hits']} hits, {report['cache_misses']} misses")
+    # Stage times are summed across workers
+    for stage, seconds in report["timings"].items():
+        print(f"  {stage:<10} {seconds * 1000:>10.1f} ms")
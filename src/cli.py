@@ -0,0 +1,169 @@
+import argparse
+import sys
+
+# Only argparse is imported up front. Each command imports what it needs when
+# it runs, so "--help" or a bad argument never pays for the parser, sqlite or
+# the HTTP server.
+
+COMMANDS = ("build", "watch", "bench")
+
+
+def add_build_arguments(parser):
+    parser.add_argument("--content", default="content", help="directory of markdown pages")
+    parser.add_argument("--template", default="template.html", help="page layout")
+    parser.add_argument("--dest", default="public", help="output directory")
+    parser.add_argument("--static", default="static",
+                        help="directory of files copied as-is into the output")
+    parser.add_argument("--asset-method", default="auto",
+                        choices=("auto", "reflink", "hardlink", "copy"),
+                        help="how static files are put into the output (default: the first "
+                             "of reflink, hardlink, copy that works)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="page renderer processes (default: CPU count, 1 renders in-process)")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every page, ignoring the build manifest")
+    parser.add_argument("--no-block-cache", dest="block_cache", action="store_false",
+                        help="render every block instead of reusing cached HTML")
+    parser.add_argument("--block-cache-size", type=int, default=100000,
+                        help="most blocks kept in the block cache")
+    parser.add_argument("--worker-memory", type=int, metavar="MB",
+                        help="cap each page renderer process's memory, renders in a pool "
+                             "even with --workers 1")
+    parser.add_argument("--write-concurrency", type=int, default=16,
+                        help="pages each renderer writes at once (raise on network volumes)")
+
+
+def megabytes(value):
+    return None if value is None else value * 1024 * 1024
+
+
+def build_command(args):
+    from assets import print_asset_report, sync_static
+    from build import build_site, default_cache_dir, print_report
+
+    profiler = None
+    if args.profile or args.trace:
+        from instrument import Profiler
+        profiler = Profiler(per_page=args.profile_pages, trace=bool(args.trace))
+    report = build_site(args.content, args.template, args.dest,
+                        workers=args.workers, force=args.force,
+                        block_cache=args.block_cache, block_cache_size=args.block_cache_size,
+                        profiler=profiler, worker_memory_limit=megabytes(args.worker_memory),
+                        write_concurrency=args.write_concurrency)
+    print_report(report)
+    assets = sync_static(args.static, args.dest, default_cache_dir(args.dest), args.asset_method)
+    print_asset_report(assets)
+    stages = [report, assets]
+    if args.compress:
+        from compress import compress_outputs, print_compress_report
+        compressed = compress_outputs(args.dest, default_cache_dir(args.dest), args.gzip_level,
+                                      args.brotli_quality, args.compress_min_size)
+        print_compress_report(compressed)
+        stages.append(compressed)
+    if args.changed_files:
+        from output import write_changed_files
+        write_changed_files(args.changed_files,
+                            [name for stage in stages for name in stage["changed_files"]],
+                            [name for stage in stages for name in stage["removed_files"]])
+    if args.profile:
+        print()
+        profiler.print_summary()
+    if args.trace:
+        profiler.write_trace(args.trace)
+    return 0
+
+
+def watch_command(args):
+    from watch import watch
+
+    watch(args.content, args.template, args.dest, args.static, args.host,
+          None if args.port < 0 else args.port, force=args.force,
+          build_options={"workers": args.workers, "block_cache": args.block_cache,
+                         "block_cache_size": args.block_cache_size,
+                         "worker_memory_limit": megabytes(args.worker_memory),
+                         "write_concurrency": args.write_concurrency},
+          asset_method=args.asset_method)
+    return 0
+
+
+def bench_command(args):
+    if args.suite:
+        import benchsuite
+
+        return benchsuite.run_and_compare(args.seed, args.scale, args.repeat, args.workloads,
+                                          args.output, args.baseline, args.threshold)
+    import bench
+
+    return bench.main(args.names)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Build the site from markdown content")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    build = commands.add_parser("build", help="render every changed page into the output")
+    add_build_arguments(build)
+    build.add_argument("--profile", action="store_true",
+                       help="print call counts, time and bytes per pipeline stage")
+    build.add_argument("--profile-pages", action="store_true",
+                       help="with --profile, also break the stages down per page")
+    build.add_argument("--trace", metavar="FILE",
+                       help="write a Chrome trace of the build (opens in speedscope too)")
+    build.add_argument("--changed-files", metavar="FILE",
+                       help="write the output files this build changed or removed, as JSON")
+    build.add_argument("--compress", action="store_true",
+                       help="write .gz (and .br with the brotli package) next to text outputs")
+    build.add_argument("--gzip-level", type=int, default=9, help="with --compress, 1 to 9")
+    build.add_argument("--brotli-quality", type=int, default=11,
+                       help="with --compress, 0 to 11")
+    build.add_argument("--compress-min-size", type=int, default=1024, metavar="BYTES",
+                       help="with --compress, leave smaller files uncompressed")
+    build.set_defaults(run=build_command)
+
+    watch = commands.add_parser("watch", help="serve the output and rebuild whenever a source "
+                                              "file changes")
+    add_build_arguments(watch)
+    watch.add_argument("--host", default="127.0.0.1", help="address to serve on")
+    watch.add_argument("--port", type=int, default=8000,
+                       help="port to serve on (0 picks a free one, -1 serves nothing)")
+    watch.set_defaults(run=watch_command)
+
+    bench = commands.add_parser("bench", help="run benchmarks, e.g. \"startup\" for the time "
+                                              "this command takes to start")
+    bench.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    suite = bench.add_argument_group(
+        "regression suite", "time the pipeline on a seeded synthetic corpus and compare the "
+                            "results with a stored baseline"
+    )
+    suite.add_argument("--suite", action="store_true",
+                       help="run the regression suite instead of the named benchmarks")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--scale", type=float, default=1.0, help="corpus size multiplier")
+    suite.add_argument("--repeat", type=int, default=3)
+    suite.add_argument("--workload", action="append", dest="workloads",
+                       help="only run this workload, may be repeated")
+    suite.add_argument("--output", metavar="FILE", help="write results to this JSON file")
+    suite.add_argument("--baseline", metavar="FILE",
+                       help="compare against results stored in this JSON file, exits with 1 "
+                            "on a regression")
+    suite.add_argument("--threshold", type=float, default=0.2,
+                       help="allowed slowdown before a result is flagged (0.2 = 20%%)")
+    bench.set_defaults(run=bench_command)
+    return parser
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    # Building is the default, so options alone still build
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["build"] + list(argv)
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command == "bench" and args.suite and args.names:
+        parser.error("--suite runs the whole suite, pick workloads with --workload")
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
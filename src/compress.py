@@ -0,0 +1,159 @@
+import gzip
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import load_manifest, save_manifest
+from output import write_atomic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text outputs worth serving pre-compressed
+COMPRESSIBLE = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".txt", ".xml", ".map")
+
+# Files smaller than this gain little and cost a request header's worth anyway
+DEFAULT_MIN_SIZE = 1024
+
+DEFAULT_GZIP_LEVEL = 9
+DEFAULT_BROTLI_QUALITY = 11
+
+# Suffix of every variant that may be produced, brotli only when importable
+VARIANTS = (".gz", ".br")
+
+
+def find_compressible(dest_dir):
+    # Relative paths of the files under dest_dir that get compressed variants
+    paths = []
+    for root, dirs, files in os.walk(dest_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(COMPRESSIBLE):
+                paths.append(os.path.relpath(os.path.join(root, name), dest_dir))
+    return paths
+
+
+def compressors(gzip_level, brotli_quality):
+    # (suffix, compress) pairs for the variants to produce. gzip gets a fixed
+    # mtime so the same input always gives the same bytes.
+    pairs = []
+    if gzip_level is not None:
+        pairs.append((".gz", lambda data: gzip.compress(data, gzip_level, mtime=0)))
+    if brotli_quality is not None and brotli is not None:
+        pairs.append((".br", lambda data: brotli.compress(data, quality=brotli_quality)))
+    return pairs
+
+
+def remove_variants(path, suffixes=VARIANTS):
+    removed = []
+    for suffix in suffixes:
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            continue
+        removed.append(suffix)
+    return removed
+
+
+def compress_file(path, pairs):
+    # Writes each variant of path that comes out smaller than the file itself
+    # and removes any other. Returns {suffix: (size, compressed size,
+    # seconds)} for the variants written, and the suffixes removed.
+    with open(path, "rb") as f:
+        data = f.read()
+    written = {}
+    for suffix, compress in pairs:
+        start = time.perf_counter()
+        compressed = compress(data)
+        seconds = time.perf_counter() - start
+        if len(compressed) < len(data):
+            write_atomic(path + suffix, compressed)
+            written[suffix] = (len(data), len(compressed), seconds)
+    removed = remove_variants(path, [suffix for suffix in VARIANTS if suffix not in written])
+    return written, removed
+
+
+def is_unchanged(path, stat, entry):
+    # Same size and mtime as when its variants were written, and they're
+    # all still there
+    return (entry is not None and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+            and all(os.path.exists(path + suffix) for suffix in entry.get("variants", ())))
+
+
+def compress_outputs(dest_dir, cache_dir, gzip_level=DEFAULT_GZIP_LEVEL,
+                     brotli_quality=DEFAULT_BROTLI_QUALITY, min_size=DEFAULT_MIN_SIZE,
+                     workers=None):
+    # Writes .gz, and .br when the brotli package is installed, next to the
+    # text files in dest_dir. A level or quality of None turns that format
+    # off. Files under min_size bytes and files unchanged since the last run
+    # are skipped. zlib and brotli both compress outside the GIL, so a
+    # thread pool of size workers compresses files in parallel.
+    started = time.perf_counter()
+    pairs = compressors(gzip_level, brotli_quality)
+    settings = {"gzip": gzip_level, "brotli": brotli_quality if brotli is not None else None}
+    manifest_path = os.path.join(cache_dir, "compressed.json")
+    old_manifest = load_manifest(manifest_path, "files")
+    # Different settings mean every variant has to be redone
+    if old_manifest is None or old_manifest.get("settings") != settings:
+        old_files = {}
+    else:
+        old_files = old_manifest["files"]
+
+    files = {}
+    pending = []
+    report = {"files": 0, "compressed": 0, "skipped": 0, "too_small": 0,
+              "bytes_in": 0, "bytes_out": 0, "seconds": 0.0,
+              "changed_files": [], "removed_files": []}
+    for rel_path in find_compressible(dest_dir):
+        path = os.path.join(dest_dir, rel_path)
+        stat = os.stat(path)
+        report["files"] += 1
+        if stat.st_size < min_size:
+            report["too_small"] += 1
+            for suffix in remove_variants(path):
+                report["removed_files"].append(rel_path + suffix)
+            continue
+        entry = old_files.get(rel_path)
+        if is_unchanged(path, stat, entry):
+            files[rel_path] = entry
+            report["skipped"] += 1
+            continue
+        files[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        pending.append(rel_path)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda rel_path: compress_file(os.path.join(dest_dir, rel_path), pairs), pending
+        ))
+    for rel_path, (written, removed) in zip(pending, results):
+        files[rel_path]["variants"] = sorted(written)
+        report["removed_files"] += [rel_path + suffix for suffix in removed]
+        report["compressed"] += 1
+        for suffix, (size, compressed_size, seconds) in written.items():
+            report["bytes_in"] += size
+            report["bytes_out"] += compressed_size
+            report["seconds"] += seconds
+            report["changed_files"].append(rel_path + suffix)
+
+    # Variants of outputs that are gone
+    for rel_path, entry in old_files.items():
+        if rel_path not in files:
+            for suffix in remove_variants(os.path.join(dest_dir, rel_path)):
+                report["removed_files"].append(rel_path + suffix)
+
+    save_manifest(manifest_path, {"settings": settings, "files": files})
+    report["elapsed"] = time.perf_counter() - started
+    return report
+
+
+def print_compress_report(report):
+    ratio = report["bytes_out"] / report["bytes_in"] if report["bytes_in"] else 1.0
+    print(f"Compressed {report['compressed']} of {report['files']} text files in "
+          f"{report['elapsed'] * 1000:.1f} ms: {report['skipped']} unchanged, "
+          f"{report['too_small']} too small")
+    # seconds is summed across threads, so it can exceed the elapsed time
+    print(f"  {report['bytes_in']} bytes in, {report['bytes_out']} bytes out, "
+          f"ratio {ratio:.2f}, {report['seconds'] * 1000:.1f} ms compressing")
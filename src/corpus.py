@@ -0,0 +1,92 @@
+import random
+
+from htmlnode import LeafNode, ParentNode
+
+WORDS = (
+    "static site markdown builder page block inline node render template "
+    "content public style link image code list quote heading paragraph"
+).split()
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_span(rng):
+    kind = rng.randrange(6)
+    if kind == 0:
+        return f"**{words(rng, 2)}**"
+    if kind == 1:
+        return f"_{words(rng, 2)}_"
+    if kind == 2:
+        return f"`{words(rng, 1)}`"
+    if kind == 3:
+        return f"[{words(rng, 2)}](https://example.com/{rng.choice(WORDS)})"
+    if kind == 4:
+        return f"![{words(rng, 2)}](https://example.com/{rng.choice(WORDS)}.png)"
+    return words(rng, 3)
+
+
+def heavy_inline_page(rng, paragraphs=40, spans=60):
+    # Long paragraphs packed with every kind of inline markup
+    blocks = [f"# {words(rng, 4)}"]
+    for _ in range(paragraphs):
+        blocks.append(" ".join(inline_span(rng) for _ in range(spans)))
+    return "\n\n".join(blocks)
+
+
+def huge_list_page(rng, items=5000):
+    # One very long list of each kind, and a long quote
+    blocks = [f"# {words(rng, 4)}"]
+    blocks.append("\n".join(f"- {inline_span(rng)} {words(rng, 3)}" for _ in range(items)))
+    blocks.append("\n".join(f"{i}. {inline_span(rng)}" for i in range(1, items + 1)))
+    blocks.append("\n".join(f"> {words(rng, 6)}" for _ in range(items)))
+    return "\n\n".join(blocks)
+
+
+def small_page(rng):
+    # A typical short page: heading, a few paragraphs, a list and some code
+    blocks = [f"# {words(rng, 3)}"]
+    for _ in range(rng.randint(2, 5)):
+        blocks.append(" ".join(inline_span(rng) for _ in range(rng.randint(3, 10))))
+    blocks.append("\n".join(f"- {words(rng, 4)}" for _ in range(rng.randint(2, 6))))
+    blocks.append("```\n" + "\n".join(words(rng, 5) for _ in range(rng.randint(2, 8))) + "\n```")
+    return "\n\n".join(blocks)
+
+
+def deep_tree(rng, depth=20000, fanout=3):
+    # Markdown here has no nesting constructs, so deep nesting is generated
+    # directly as an HTMLNode tree, like deeply nested generated content
+    node = LeafNode("span", words(rng, 2))
+    for _ in range(depth):
+        siblings = [LeafNode("b", words(rng, 1)) for _ in range(fanout - 1)]
+        node = ParentNode("div", siblings + [node], {"class": rng.choice(WORDS)})
+    return node
+
+
+def generate_corpus(seed=0, scale=1.0):
+    # Returns {workload: {"documents": [markdown, ...], "tree": HTMLNode or
+    # None}}. The same seed and scale always give the same corpus.
+    rng = random.Random(seed)
+
+    def scaled(count):
+        return max(1, int(count * scale))
+
+    return {
+        "heavy_inline": {
+            "documents": [heavy_inline_page(rng, paragraphs=scaled(40)) for _ in range(3)],
+            "tree": None,
+        },
+        "deep_nesting": {
+            "documents": [],
+            "tree": deep_tree(rng, depth=scaled(20000)),
+        },
+        "huge_list": {
+            "documents": [huge_list_page(rng, items=scaled(5000))],
+            "tree": None,
+        },
+        "many_small_pages": {
+            "documents": [small_page(rng) for _ in range(scaled(500))],
+            "tree": None,
+        },
+    }
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    # Gives each test a fresh temporary directory, removed afterwards, and
+    # helpers for the files in it. Relative paths are taken from self.root.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def write(self, path, data):
+        # A str is written as UTF-8, bytes as they are
+        path = self.path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def read(self, path):
+        with open(self.path(path), encoding="utf-8") as f:
+            return f.read()
+
+    def read_bytes(self, path):
+        with open(self.path(path), "rb") as f:
+            return f.read()
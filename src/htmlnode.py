@@ -1,4 +1,74 @@
+import html
+import re
+
+# Attribute values without any of these can be used as they are
+UNSAFE_ATTRIBUTE_CHARS = re.compile(r'[&<>"\']')
+
+def escape_attribute(value):
+    value = str(value)
+    if UNSAFE_ATTRIBUTE_CHARS.search(value) is None:
+        return value
+    return html.escape(value, quote=True)
+
+def attributes_to_html(props):
+    return "".join(f' {key}="{escape_attribute(value)}"' for key, value in props.items())
+
+
+class Props(dict):
+    # HTML attributes that remember their rendered string until changed.
+    # Nodes keep whatever mapping they are given, so only props passed in as
+    # a Props are cached.
+    __slots__ = ("html",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.html = None
+
+    def to_html(self):
+        if self.html is None:
+            self.html = attributes_to_html(self)
+        return self.html
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.html = None
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.html = None
+
+    def __ior__(self, other):
+        self.html = None
+        return super().__ior__(other)
+
+    def clear(self):
+        super().clear()
+        self.html = None
+
+    def pop(self, *args):
+        self.html = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self.html = None
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.html = None
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.html = None
+
+    def __reduce__(self):
+        return (Props, (dict(self),))
+
+
 class HTMLNode: 
+    # Subclasses declare empty __slots__ too, so no node gets a __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -7,21 +77,32 @@ class HTMLNode:
 
     def to_html(self):
         raise NotImplementedError
-    
+
+    def iter_html(self):
+        # Subclasses stream their markup in chunks, by default it is one chunk
+        yield self.to_html()
+
+    def write_html(self, sink):
+        # sink is a file-like object with write(), or a list to append to
+        write = sink.append if isinstance(sink, list) else sink.write
+        for chunk in self.iter_html():
+            write(chunk)
+
     def props_to_html(self):
-        if self.props == None:
+        if self.props is None:
             return ''
-
-        result = ""
-        for key, value in self.props.items():
-            result += f' {key}="{value}"'
-        return result
+        if isinstance(self.props, Props):
+            return self.props.to_html()
+        # Its owner may change a plain dict at any time, so it isn't cached
+        return attributes_to_html(self.props)
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
     
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, props=props)
 
@@ -31,31 +112,42 @@ class LeafNode(HTMLNode):
             raise ValueError("leaf node is none")
         if self.tag is None:
             return self.value
-        
-        props_str = ""
-        if self.props:
-                for prop, value in self.props.items():
-                    props_str += f' {prop}="{value}"'    
     
-        return f"<{self.tag}{props_str}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, children=children, props=props)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # Walk the tree with an explicit stack instead of recursing, so
+        # nesting depth is not bounded by the recursion limit
+        yield self.open_tag()
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    yield child.open_tag()
+                    stack.append((child, iter(child.children)))
+                    break
+                if isinstance(child, LeafNode):
+                    yield child.to_html()
+                else:
+                    yield from child.iter_html()
+            else:
+                stack.pop()
+                yield f"</{node.tag}>"
+
+    def open_tag(self):
         if self.tag is None:
             raise ValueError("tag is none")
         if self.children is None:
             raise ValueError("missing children")
             
-        props_str = ""
-        if self.props:
-            for prop, value in self.props.items():
-                props_str += f' {prop}="{value}"' 
-            
-        node_str = ""
-        for child in self.children: 
-            node_str += child.to_html()
-        
-        return f"<{self.tag}{props_str}>{node_str}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>"
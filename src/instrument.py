@@ -0,0 +1,222 @@
+import functools
+import importlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# (module, attribute) pairs wrapped while instrumentation is on. Functions
+# look each other up through module globals, so wrapping the attribute is
+# enough to see every call.
+TARGETS = (
+    ("main", "markdown_to_blocks"),
+    ("main", "block_to_block_type"),
+    ("main", "block_to_html_node"),
+    ("main", "markdown_to_html_node"),
+    ("main", "text_to_textnodes"),
+    ("main", "text_node_to_html_node"),
+    ("main", "text_nodes_to_html_nodes"),
+    ("build", "markdown_to_blocks"),
+    ("build", "block_to_html_node"),
+    ("build", "read_source"),
+    ("output", "write_if_changed"),
+    ("htmlnode", "LeafNode.to_html"),
+    ("htmlnode", "ParentNode.to_html"),
+    ("htmlnode", "HTMLNode.write_html"),
+)
+
+# The page being rendered is taken from this argument of build.render_page
+PAGE_TARGET = ("build", "render_page")
+
+# Profiler that wrapped functions currently report to
+active = None
+originals = {}
+
+
+class Profiler:
+    # Call counts, inclusive time and bytes produced per stage, optionally
+    # per page, and optionally every call as a trace event. Safe to record
+    # into from several threads; the page is tracked per thread.
+    def __init__(self, per_page=False, trace=False):
+        self.per_page = per_page
+        self.trace = trace
+        self.stats = {}
+        self.pages = {}
+        self.events = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @property
+    def page(self):
+        return getattr(self.local, "page", None)
+
+    @page.setter
+    def page(self, page):
+        self.local.page = page
+
+    def record(self, stage, start, end, size=0):
+        page = self.page
+        with self.lock:
+            add_stat(self.stats, stage, 1, end - start, size)
+            if self.per_page and page is not None:
+                add_stat(self.pages.setdefault(page, {}), stage, 1, end - start, size)
+            if self.trace:
+                event = {
+                    "name": stage,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+                if page is not None:
+                    event["args"] = {"page": page}
+                self.events.append(event)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    @contextmanager
+    def current_page(self, page):
+        with self.on_page(page), self.stage("page"):
+            yield
+
+    @contextmanager
+    def on_page(self, page):
+        # Charges what this thread records to page, without timing it as a
+        # page of its own. For work done on a page's behalf elsewhere, such
+        # as its write in the output stage's threads.
+        previous = self.page
+        self.page = page
+        try:
+            yield
+        finally:
+            self.page = previous
+
+    def drain(self):
+        # Everything recorded so far as plain data, then starts over. Worker
+        # processes send this back to be merged into the parent's profiler.
+        with self.lock:
+            data = {"stats": self.stats, "pages": self.pages, "events": self.events}
+            self.stats, self.pages, self.events = {}, {}, []
+        return data
+
+    def merge(self, data):
+        with self.lock:
+            for stage, (calls, seconds, size) in data["stats"].items():
+                add_stat(self.stats, stage, calls, seconds, size)
+            for page, stats in data["pages"].items():
+                page_stats = self.pages.setdefault(page, {})
+                for stage, (calls, seconds, size) in stats.items():
+                    add_stat(page_stats, stage, calls, seconds, size)
+            self.events.extend(data["events"])
+
+    def print_summary(self):
+        print_stats("stage", self.stats)
+        for page, stats in sorted(self.pages.items()):
+            print()
+            print_stats(page, stats)
+
+    def write_trace(self, path):
+        # Chrome trace event format, also opened by speedscope and Perfetto
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+def add_stat(stats, stage, calls, seconds, size):
+    entry = stats.setdefault(stage, [0, 0.0, 0])
+    entry[0] += calls
+    entry[1] += seconds
+    entry[2] += size
+
+
+def print_stats(title, stats):
+    # Times are inclusive: a stage includes the stages it calls
+    print(f"{title:<32} {'calls':>9} {'total ms':>10} {'bytes':>12}")
+    for stage, (calls, seconds, size) in sorted(stats.items(), key=lambda item: -item[1][1]):
+        print(f"  {stage:<30} {calls:>9} {seconds * 1000:>10.1f} {size:>12}")
+
+
+def result_size(result):
+    # Text and bytes count as produced, an int is a count of bytes written
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    if isinstance(result, bytes):
+        return len(result)
+    return 0
+
+
+def resolve(module_name, attribute):
+    owner = importlib.import_module(module_name)
+    name = attribute
+    if "." in attribute:
+        class_name, name = attribute.split(".")
+        owner = getattr(owner, class_name)
+    return owner, name
+
+
+def wrap(stage, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = active
+        if profiler is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        profiler.record(stage, start, time.perf_counter(), result_size(result))
+        return result
+    return wrapper
+
+
+def wrap_page(func):
+    @functools.wraps(func)
+    def wrapper(source_path, *args, **kwargs):
+        profiler = active
+        if profiler is None:
+            return func(source_path, *args, **kwargs)
+        with profiler.current_page(source_path):
+            return func(source_path, *args, **kwargs)
+    return wrapper
+
+
+def instrument(profiler):
+    # Starts reporting every call of TARGETS to profiler
+    global active
+    if not originals:
+        for module_name, attribute in TARGETS + (PAGE_TARGET,):
+            owner, name = resolve(module_name, attribute)
+            func = owner.__dict__[name]
+            originals[(module_name, attribute)] = func
+            if (module_name, attribute) == PAGE_TARGET:
+                setattr(owner, name, wrap_page(func))
+            else:
+                # Named after where the function is defined, so one imported
+                # into several modules is still one stage
+                setattr(owner, name, wrap(f"{func.__module__}.{func.__qualname__}", func))
+    active = profiler
+
+
+def uninstrument():
+    global active
+    active = None
+    for (module_name, attribute), func in originals.items():
+        owner, name = resolve(module_name, attribute)
+        setattr(owner, name, func)
+    originals.clear()
+
+
+@contextmanager
+def profiling(profiler):
+    instrument(profiler)
+    try:
+        yield profiler
+    finally:
+        uninstrument()
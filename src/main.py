@@ -1,28 +1,63 @@
-from textnode import *
-from htmlnode import *
-from blocknode import *
-import re
+from textnode import TextNode, TextType
+from htmlnode import LeafNode, ParentNode, Props
+from blocknode import BlockType
+from patterns import PATTERNS
+import mmap
+import os
+import threading
+from itertools import islice
 
 
+def text_leaf(tag):
+    def convert(text_node):
+        return LeafNode(tag, text_node.text)
+    return convert
+
+# Props remember their rendered string, which matters most for the leaves
+# text_nodes_to_html_nodes shares between equal links, such as nav links
+def link_to_leaf(text_node):
+    return LeafNode("a", text_node.text, Props(href=text_node.url))
+
+def image_to_leaf(text_node):
+    return LeafNode("img", "", Props(src=text_node.url, alt=text_node.text))
+
+TEXT_NODE_CONVERTERS = {
+    TextType.TEXT: text_leaf(None),
+    TextType.BOLD: text_leaf("b"),
+    TextType.ITALIC: text_leaf("i"),
+    TextType.CODE: text_leaf("code"),
+    TextType.LINK: link_to_leaf,
+    TextType.IMAGE: image_to_leaf,
+}
+
 def text_node_to_html_node(text_node):
-    match text_node.text_type:
-        case TextType.TEXT:
-            return LeafNode(tag=None, value=text_node.text)
-        case TextType.BOLD:
-            return LeafNode(tag="b", value=text_node.text)
-        case TextType.ITALIC:
-            return LeafNode(tag="i", value=text_node.text)
-        case TextType.CODE:
-            return LeafNode(tag="code", value=text_node.text)
-        case TextType.LINK:
-            return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
-        case TextType.IMAGE:
-            return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
-        case _:
-            raise Exception(f"Invalid type: {text_node.text_type}")
-        
+    convert = TEXT_NODE_CONVERTERS.get(text_node.text_type)
+    if convert is None:
+        raise Exception(f"Invalid type: {text_node.text_type}")
+    return convert(text_node)
+
+def text_nodes_to_html_nodes(text_nodes, leaves=None):
+    # Converts a whole list at once. Equal text nodes get the same LeafNode,
+    # which is safe because nothing modifies a leaf after it is built; pass
+    # the same leaves dict to several calls to share leaves between them.
+    if leaves is None:
+        leaves = {}
+    converters = TEXT_NODE_CONVERTERS
+    html_nodes = []
+    for text_node in text_nodes:
+        key = (text_node.text_type, text_node.text, text_node.url)
+        leaf = leaves.get(key)
+        if leaf is None:
+            convert = converters.get(text_node.text_type)
+            if convert is None:
+                raise Exception(f"Invalid type: {text_node.text_type}")
+            leaf = leaves[key] = convert(text_node)
+        html_nodes.append(leaf)
+    return html_nodes
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
+    size = len(delimiter)
 
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
@@ -31,119 +66,116 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         
         text = old_node.text
         index = text.find(delimiter)
-        if index != -1:
-            last_index = text.find(delimiter, index + len(delimiter))
-            if last_index != -1:
-                # Text before delimiter
-                text_before = text[:index]
-                if text_before:
-                    new_nodes.append(TextNode(text_before, TextType.TEXT))
-                
-                # Text between delimiters
-                text_between = text[index + len(delimiter):last_index]
-                new_nodes.append(TextNode(text_between, text_type))
-                
-                # Text after delimiter - recursively process this part
-                text_after = text[last_index + len(delimiter):]
-                # Create a new TextNode and recursively process it
-                after_nodes = split_nodes_delimiter([TextNode(text_after, TextType.TEXT)], delimiter, text_type)
-                new_nodes.extend(after_nodes)
-            else:
-                # No closing delimiter found
-                raise Exception(f"No closing delimiter found for {delimiter}")
-        else:
+        if index == -1:
             # No delimiter found in this node, keep it as is
             new_nodes.append(old_node)
+            continue
+
+        # Walk the text with offsets instead of recursing on sliced tails
+        start = 0
+        while index != -1:
+            last_index = text.find(delimiter, index + size)
+            if last_index == -1:
+                # No closing delimiter found
+                raise Exception(f"No closing delimiter found for {delimiter}")
+
+            # Text before delimiter
+            if index > start:
+                new_nodes.append(TextNode(text[start:index], TextType.TEXT))
+
+            # Text between delimiters
+            new_nodes.append(TextNode(text[index + size:last_index], text_type))
+
+            start = last_index + size
+            index = text.find(delimiter, start)
+
+        # Text after the last delimiter is always kept, even when empty
+        new_nodes.append(TextNode(text[start:], TextType.TEXT))
     
     return new_nodes
 
 def extract_markdown_images(text):
-    new_img_tuple = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    new_img_tuple = PATTERNS["image"].findall(text)
     return new_img_tuple
 
 def extract_markdown_links(text):
-    new_links_tuple = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    new_links_tuple = PATTERNS["link"].findall(text)
     return new_links_tuple
 
 def split_nodes_image(old_nodes):
+    return _split_nodes_pattern(old_nodes, PATTERNS["image"], TextType.IMAGE)
+
+def split_nodes_link(old_nodes):
+    return _split_nodes_pattern(old_nodes, PATTERNS["link"], TextType.LINK)
+
+def _split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
 
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
-    
-        images = extract_markdown_images(old_node.text)
-
-        if not images:
-            new_nodes.append(old_node)
-            continue
 
-        remaining_text = old_node.text
+        text = old_node.text
+        start = 0
+        for match in pattern.finditer(text):
+            # Create a node for the text before the match (if not empty)
+            if match.start() > start:
+                new_nodes.append(TextNode(text[start:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            start = match.end()
 
-        for alt_text, image_url in images:
-            image_markdown = f"![{alt_text}]({image_url})"
-            parts = remaining_text.split(image_markdown, 1)
-            
-            # Create a node for the text before the image (if not empty)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-            
-            # Create a node for the image
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, image_url))
+        if start == 0:
+            # Nothing matched, keep the node as is
+            new_nodes.append(old_node)
+        elif start < len(text):
+            # Don't forget to add any remaining text
+            new_nodes.append(TextNode(text[start:], TextType.TEXT))
 
-            # Update remaining text for next iteration
-            if len(parts) > 1:
-                remaining_text = parts[1]
-            else:
-                remaining_text = ""
-        
-        # After processing all images, don't forget to add any remaining text
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-    
     return new_nodes
 
-def split_nodes_link(old_nodes):
+def split_nodes_image_link(old_nodes):
+    # Same result as split_nodes_link(split_nodes_image(old_nodes)), but
+    # images and links are found in a single regex pass over each node
     new_nodes = []
+    pattern = PATTERNS["image_or_link"]
 
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
-    
-        links = extract_markdown_links(old_node.text)
-
-        if not links:
-            new_nodes.append(old_node)
-            continue
-
-        remaining_text = old_node.text
 
-        for link_text, link_url in links:
-            link_markdown = f"[{link_text}]({link_url})"
-            parts = remaining_text.split(link_markdown, 1)
-            
-            # Create a node for the text before the link (if not empty)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-            
-            # Create a node for the link
-            new_nodes.append(TextNode(link_text, TextType.LINK, link_url))
+        text = old_node.text
+        first = len(new_nodes)
+        start = 0
+        for match in pattern.finditer(text):
+            is_image = match.group(1) is not None
+            if not is_image and text.find("![", match.start(), match.end()) != -1:
+                # An image may overlap this link; images take priority in the
+                # two-pass version, so let it handle this rare node
+                del new_nodes[first:]
+                new_nodes.extend(split_nodes_link(split_nodes_image([old_node])))
+                break
 
-            # Update remaining text for next iteration
-            if len(parts) > 1:
-                remaining_text = parts[1]
+            if match.start() > start:
+                new_nodes.append(TextNode(text[start:match.start()], TextType.TEXT))
+            if is_image:
+                new_nodes.append(TextNode(match.group(2), TextType.IMAGE, match.group(3)))
             else:
-                remaining_text = ""
-        
-        # After processing all links, don't forget to add any remaining text
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+                new_nodes.append(TextNode(match.group(2), TextType.LINK, match.group(3)))
+            start = match.end()
+        else:
+            if start == 0:
+                new_nodes.append(old_node)
+            elif start < len(text):
+                new_nodes.append(TextNode(text[start:], TextType.TEXT))
 
     return new_nodes
 
-def text_to_textnodes(text):
+def text_to_textnodes(text, single_pass=False):
+    if single_pass:
+        return text_to_textnodes_single_pass(text)
+
     new_nodes = [TextNode(text, TextType.TEXT)]
     # For bold text - need to pass delimiter "**" and TextType.BOLD
     new_nodes = split_nodes_delimiter(new_nodes, "**", TextType.BOLD)
@@ -157,6 +189,79 @@ def text_to_textnodes(text):
     new_nodes = split_nodes_link(new_nodes)
     return new_nodes
 
+# Delimiters in the order text_to_textnodes applies them
+INLINE_DELIMITERS = (
+    ("**", TextType.BOLD),
+    ("_", TextType.ITALIC),
+    ("`", TextType.CODE),
+)
+
+def text_to_textnodes_single_pass(text):
+    # Same result as the chained split_nodes_* passes, built in one pass
+    # over the output rather than the text: every segment is tracked as
+    # (start, end) offsets into the original text and each node is created
+    # exactly once, left to right, into a single list, with no intermediate
+    # node lists. The text itself is still scanned once per delimiter and
+    # again for images and links in each plain segment, so on typical pages
+    # it is barely faster than the chained passes.
+    nodes = []
+    try:
+        _scan_delimited(text, 0, len(text), 0, nodes)
+    except Exception:
+        # The scan stops at the first unclosed delimiter it reaches, the
+        # chained passes at the first in INLINE_DELIMITERS order. Rerun them
+        # so authors get the same error either way; only invalid text pays.
+        text_to_textnodes(text)
+        raise
+    return nodes
+
+def _scan_delimited(text, start, end, level, nodes):
+    if level == len(INLINE_DELIMITERS):
+        _scan_images(text, start, end, nodes)
+        return
+
+    delimiter, text_type = INLINE_DELIMITERS[level]
+    size = len(delimiter)
+    index = text.find(delimiter, start, end)
+    while index != -1:
+        closing = text.find(delimiter, index + size, end)
+        if closing == -1:
+            raise Exception(f"No closing delimiter found for {delimiter}")
+        # Text before delimiter goes through the remaining passes
+        if index > start:
+            _scan_delimited(text, start, index, level + 1, nodes)
+        nodes.append(TextNode(text[index + size:closing], text_type))
+        start = closing + size
+        index = text.find(delimiter, start, end)
+
+    # Like split_nodes_delimiter, the trailing text is kept even when empty
+    _scan_delimited(text, start, end, level + 1, nodes)
+
+def _scan_images(text, start, end, nodes):
+    matched = False
+    for match in PATTERNS["image"].finditer(text, start, end):
+        matched = True
+        if match.start() > start:
+            _scan_links(text, start, match.start(), nodes)
+        nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        start = match.end()
+
+    # A segment without images is passed on untouched, even when empty
+    if start < end or not matched:
+        _scan_links(text, start, end, nodes)
+
+def _scan_links(text, start, end, nodes):
+    matched = False
+    for match in PATTERNS["link"].finditer(text, start, end):
+        matched = True
+        if match.start() > start:
+            nodes.append(TextNode(text[start:match.start()], TextType.TEXT))
+        nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+        start = match.end()
+
+    if start < end or not matched:
+        nodes.append(TextNode(text[start:end], TextType.TEXT))
+
 def markdown_to_blocks(markdown):
     new_blocks = []
     splitted_blocks = markdown.split("\n\n")
@@ -169,42 +274,178 @@ def markdown_to_blocks(markdown):
 
     return new_blocks
 
-def block_to_block_type(block):
-    if block.startswith('#'):
-        count = 0
-        for char in block:
-            if char == '#':
-                count += 1
-            else:
+def iter_markdown_blocks(source):
+    # Yields the same blocks as markdown_to_blocks, reading one line at a time
+    # so only the current block is held in memory. source is anything with
+    # readline(): a binary file, an mmap, or a text file opened with
+    # newline="\n" (other newline modes rewrite "\r\n" before we see it).
+    readline = source.readline
+    lines = []
+    while True:
+        line = readline()
+        if not line:
+            break
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if line == "\n":
+            # An empty line is where markdown.split("\n\n") would cut
+            block = join_block_lines(lines)
+            if block:
+                yield block
+            lines = []
+        else:
+            lines.append(line.strip())
+
+    block = join_block_lines(lines)
+    if block:
+        yield block
+
+def iter_markdown_file_blocks(path, use_mmap=False):
+    with open(path, "rb") as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from iter_markdown_blocks(mapped)
+        else:
+            yield from iter_markdown_blocks(f)
+
+def join_block_lines(lines):
+    # Stripped lines of one block, without the empty lines at either end
+    start, end = 0, len(lines)
+    while start < end and not lines[start]:
+        start += 1
+    while end > start and not lines[end - 1]:
+        end -= 1
+    return "\n".join(lines[start:end])
+
+# "1. ", "2. ", ... each formatted once per process, as far as the longest
+# ordered list seen so far but no further than MAX_ORDERED_ITEM_PREFIXES.
+# Only ever replaced, under the lock, by a longer tuple, so threads can read
+# it without the lock.
+MAX_ORDERED_ITEM_PREFIXES = 1 << 17
+ORDERED_ITEM_PREFIXES = ()
+ordered_item_prefixes_lock = threading.Lock()
+
+def ordered_item_prefixes(count):
+    # At least min(count, MAX_ORDERED_ITEM_PREFIXES) prefixes, growing the
+    # tuple by doubling
+    global ORDERED_ITEM_PREFIXES
+    with ordered_item_prefixes_lock:
+        prefixes = ORDERED_ITEM_PREFIXES
+        if len(prefixes) < count:
+            size = min(max(count, 2 * len(prefixes)), MAX_ORDERED_ITEM_PREFIXES)
+            prefixes += tuple(f"{i}. " for i in range(len(prefixes) + 1, size + 1))
+            ORDERED_ITEM_PREFIXES = prefixes
+    return prefixes
+
+def is_ordered_list(lines):
+    # Whether line i starts with "i. ", stopping at the first line that
+    # doesn't. The prefixes known so far are checked before any more are
+    # formatted, so a block that stops being a list early formats nothing.
+    prefixes = ORDERED_ITEM_PREFIXES
+    checked = 0
+    while checked < len(lines):
+        if checked == len(prefixes):
+            if checked >= MAX_ORDERED_ITEM_PREFIXES:
                 break
-        if 1 <= count <= 6 and block[count] == ' ':
-            return BlockType.HEADING
+            prefixes = ordered_item_prefixes(min(len(lines), 2 * checked or 16))
+        end = min(len(lines), len(prefixes))
+        if not all(map(str.startswith, islice(lines, checked, end), islice(prefixes, checked, end))):
+            return False
+        checked = end
+
+    # Longer lists than that compare each number with a counter instead
+    for number, line in enumerate(islice(lines, checked, None), checked + 1):
+        dot = line.find(". ")
+        digits = line[:dot]
+        if (dot < 1 or digits[0] == "0" or not (digits.isascii() and digits.isdigit())
+                or int(digits) != number):
+            return False
+    return True
+
+def block_to_block_type(block):
+    return classify_block(block)[0]
+
+def classify_block(block):
+    # Returns the block type and what the check found out on the way, so
+    # renderers don't parse the block again: the level for headings, the
+    # lines for ordered lists and None otherwise
+    heading = PATTERNS["heading"].match(block)
+    if heading:
+        return BlockType.HEADING, heading.end() - 1
             
-    if block.startswith('```') and block.rstrip().endswith('```'):
-        return BlockType.CODE
-    
-    lines = block.split('\n')
+    if PATTERNS["code_block"].match(block):
+        return BlockType.CODE, None
 
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
-    
-    if all(line.startswith('- ') for line in lines):
-        return BlockType.ULIST
+    # Quotes and lists have to start that way on their first line, so the
+    # first line alone picks the one type the whole block is checked against
+    if block.startswith(">"):
+        if PATTERNS["quote_block"].fullmatch(block):
+            return BlockType.QUOTE, None
+    elif block.startswith("- "):
+        if PATTERNS["unordered_list_block"].fullmatch(block):
+            return BlockType.ULIST, None
+    elif block.startswith("1. "):
+        lines = block.split("\n")
+        if is_ordered_list(lines):
+            return BlockType.OLIST, lines
     
-    is_ordered = True
-    for i, line in enumerate(lines, 1):
-        if not line.startswith(f"{i}. "):
-            is_ordered = False
-            break
-    if is_ordered:
-        return BlockType.OLIST
-    
-    return BlockType.PARAGRAPH
+    return BlockType.PARAGRAPH, None
+
+def text_to_children(text):
+    return text_nodes_to_html_nodes(text_to_textnodes(text, single_pass=True))
+
+def heading_to_html_node(block, level):
+    return ParentNode(f"h{level}", text_to_children(block[level + 1:]))
+
+def code_to_html_node(block, _):
+    # Code is kept verbatim, no inline parsing
+    code = block.rstrip()[3:-3]
+    if code.startswith("\n"):
+        code = code[1:]
+    return ParentNode("pre", [LeafNode("code", code)])
+
+def quote_to_html_node(block, _):
+    text = " ".join(line[1:].strip() for line in block.split("\n"))
+    return ParentNode("blockquote", text_to_children(text))
+
+def ulist_to_html_node(block, _):
+    items = [ParentNode("li", text_to_children(line[2:])) for line in block.split("\n")]
+    return ParentNode("ul", items)
+
+def olist_to_html_node(block, lines):
+    # The classifier checked every line starts with its "N. ", and a number
+    # never contains ". ", so the first one ends the prefix
+    items = [ParentNode("li", text_to_children(line[line.index(". ") + 2:])) for line in lines]
+    return ParentNode("ol", items)
+
+def paragraph_to_html_node(block, _):
+    return ParentNode("p", text_to_children(block.replace("\n", " ")))
+
+BLOCK_RENDERERS = {
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+    BlockType.ULIST: ulist_to_html_node,
+    BlockType.OLIST: olist_to_html_node,
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+}
 
-def main():
+def block_to_html_node(block):
+    block_type, found = classify_block(block)
+    return BLOCK_RENDERERS[block_type](block, found)
 
-    node = TextNode("test", TextType.LINK, "www.google.com")
-    print(node)   
+def markdown_to_html_node(markdown):
+    children = [block_to_html_node(block) for block in markdown_to_blocks(markdown)]
+    return ParentNode("div", children)
 
-main()
+def extract_title(markdown):
+    for line in markdown.split("\n"):
+        if line.startswith("# "):
+            return line[2:].strip()
+    raise Exception("No title found")
 
+if __name__ == "__main__":
+    # The command line is in cli.py; this keeps "python3 src/main.py" building
+    import sys
+    from cli import main
+    sys.exit(main(["build"] + sys.argv[1:]))
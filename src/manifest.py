@@ -0,0 +1,39 @@
+import hashlib
+import json
+import os
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    with open(path, "rb") as f:
+        return hash_bytes(f.read())
+
+
+def empty_manifest(generator, template):
+    return {"generator": generator, "template": template, "pages": {}}
+
+
+def load_manifest(path, section="pages"):
+    # A missing or unreadable manifest just means nothing is up to date.
+    # section names the dict of entries every manifest of its kind has.
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get(section), dict):
+        return None
+    return manifest
+
+
+def save_manifest(path, manifest):
+    # Written to a temporary file first so an interrupted build never leaves
+    # a half-written manifest behind
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+
+# asyncio and the thread pool are imported by the functions that use them,
+# they would otherwise double the time "import build" takes
+
+# Most pages being written at once. Writes mostly wait on the filesystem, so
+# this is worth raising on network volumes.
+DEFAULT_CONCURRENCY = 16
+
+
+def page_bytes(data):
+    # A page as bytes, from bytes, a string or string chunks such as the
+    # output of iter_html() or Template.segments()
+    if isinstance(data, bytes):
+        return data
+    if not isinstance(data, str):
+        data = "".join(data)
+    return data.encode("utf-8")
+
+
+def same_bytes(path, data):
+    # Whether the file at path already holds exactly data. The size is
+    # checked first, so most changed files are never read.
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def temp_path(path):
+    # Where to write path's new version before renaming it over path. Unique
+    # per process and thread, so it never collides with another writer.
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def write_atomic(path, data):
+    # Written to a temporary file next to path and renamed over it, so a
+    # reader never sees half a page. os.open applies the umask like a plain
+    # open() would.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = temp_path(path)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_if_changed(path, data):
+    # Returns the number of bytes written, or None when path was already
+    # up to date and was left alone
+    data = page_bytes(data)
+    if same_bytes(path, data):
+        return None
+    write_atomic(path, data)
+    return len(data)
+
+
+async def write_pages_async(pages, concurrency=DEFAULT_CONCURRENCY, write=None):
+    # Writes (path, data) pairs with at most concurrency writes in flight,
+    # each in a thread of its own. Returns what write_if_changed, or write
+    # when given, returned for each page, in order.
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    if write is None:
+        write = write_if_changed
+
+    async def write_page(path, data):
+        async with semaphore:
+            return await loop.run_in_executor(None, write, path, data)
+
+    return await asyncio.gather(*(write_page(path, data) for path, data in pages))
+
+
+def write_pages(pages, concurrency=DEFAULT_CONCURRENCY, write=None):
+    # Blocking version of write_pages_async for code outside an event loop
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=concurrency)
+        )
+        return await write_pages_async(pages, concurrency, write)
+
+    return asyncio.run(run())
+
+
+def write_changed_files(path, changed, removed):
+    # What a build changed in the output directory, as JSON paths relative
+    # to it, so deploy tooling can upload and delete just those
+    files = {
+        "changed": sorted(name.replace(os.sep, "/") for name in changed),
+        "removed": sorted(name.replace(os.sep, "/") for name in removed),
+    }
+    write_atomic(path, json.dumps(files, indent=1).encode("utf-8"))
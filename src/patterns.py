@@ -0,0 +1,39 @@
+import re
+
+# Every regex used by the inline and block parsers, by name
+PATTERN_SOURCES = {
+    # Inline grammar
+    "image": r"!\[([^\[\]]*)\]\(([^\(\)]*)\)",
+    "link": r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)",
+    # Group 1 is "!" for images and None for links
+    "image_or_link": r"(?:(!)|(?<!!))\[([^\[\]]*)\]\(([^\(\)]*)\)",
+    # Block grammar, used with match() or fullmatch() on a whole block
+    "heading": r"#{1,6} ",
+    "code_block": r"(?=```)[\s\S]*```\s*\Z",
+    "quote_block": r"(?:>[^\n]*\n)*>[^\n]*",
+    "unordered_list_block": r"(?:- [^\n]*\n)*- [^\n]*",
+}
+
+# Compiled patterns, looked up by name at call time so that a new engine
+# takes effect everywhere
+PATTERNS = {}
+
+regex_engine = re
+
+
+def compile_patterns(engine=re):
+    compiled = {name: engine.compile(source) for name, source in PATTERN_SOURCES.items()}
+    PATTERNS.update(compiled)
+
+
+def set_regex_engine(engine):
+    # engine is any module with a re-compatible compile(), e.g. the
+    # third-party "regex" package. Returns the previous engine.
+    global regex_engine
+    previous = regex_engine
+    compile_patterns(engine)
+    regex_engine = engine
+    return previous
+
+
+compile_patterns()
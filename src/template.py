@@ -0,0 +1,43 @@
+import re
+
+# A slot is a name in double braces, e.g. {{ Title }}
+SLOT = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    # A page layout split once into the static text between slots and the
+    # slots themselves, so filling it in never rescans the layout. Plain
+    # data, so it pickles cheaply into worker processes.
+    __slots__ = ("source", "pieces")
+
+    def __init__(self, source):
+        self.source = source
+        # (static text, slot name, slot text) triples. The last one has no
+        # slot, and a slot without a value is left as its own text.
+        self.pieces = []
+        start = 0
+        for match in SLOT.finditer(source):
+            self.pieces.append((source[start:match.start()], match.group(1), match.group(0)))
+            start = match.end()
+        self.pieces.append((source[start:], None, None))
+
+    def segments(self, values):
+        # The page as a list of strings. A value is a string or a list of
+        # strings, so content rendered in chunks isn't joined on its own
+        # before being joined into the page.
+        out = []
+        for static, name, raw in self.pieces:
+            out.append(static)
+            if name is None:
+                continue
+            value = values.get(name)
+            if value is None:
+                out.append(raw)
+            elif isinstance(value, str):
+                out.append(value)
+            else:
+                out.extend(value)
+        return out
+
+    def render(self, values):
+        return "".join(self.segments(values))
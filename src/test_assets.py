@@ -0,0 +1,106 @@
+import os
+import unittest
+
+from assets import find_static_files, sync_static
+from fixtures import TempDirTestCase
+
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = self.path("static")
+        self.dest = self.path("public")
+        self.cache = self.path(".build-cache")
+        self.write(os.path.join(self.static, "styles.css"), b"body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), b"\x89PNG" * 100)
+
+    def test_find_static_files(self):
+        self.assertEqual(find_static_files(self.static),
+                         ["styles.css", os.path.join("images", "logo.png")])
+
+    def check_sync(self, method):
+        report = sync_static(self.static, self.dest, self.cache, method)
+        self.assertEqual((report["copied"], report["skipped"]), (2, 0))
+        self.assertEqual(report["bytes_copied"], 407)
+        self.assertEqual(self.read_bytes(os.path.join(self.dest, "images", "logo.png")), b"\x89PNG" * 100)
+
+        report = sync_static(self.static, self.dest, self.cache, method)
+        self.assertEqual((report["copied"], report["skipped"]), (0, 2))
+        self.assertEqual((report["bytes_copied"], report["bytes_skipped"]), (0, 407))
+        return report
+
+    def test_copy(self):
+        self.check_sync("copy")
+        self.assertEqual(os.stat(os.path.join(self.dest, "styles.css")).st_nlink, 1)
+
+    def test_hardlink(self):
+        self.check_sync("hardlink")
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "styles.css"),
+                                         os.path.join(self.dest, "styles.css")))
+
+        # Replacing a linked file must not write through to the source
+        os.remove(os.path.join(self.dest, "styles.css"))
+        self.write(os.path.join(self.dest, "styles.css"), b"p {}")
+        report = sync_static(self.static, self.dest, self.cache, "hardlink")
+        self.assertEqual(report["copied"], 1)
+        self.assertEqual(self.read_bytes(os.path.join(self.static, "styles.css")), b"body {}")
+
+    def test_hardlinked_source_edited_in_place(self):
+        self.check_sync("hardlink")
+        # The output is the same file, so it changes along with the source
+        with open(os.path.join(self.static, "styles.css"), "ab") as f:
+            f.write(b"p {}")
+        report = sync_static(self.static, self.dest, self.cache, "hardlink")
+        self.assertEqual(report["copied"], 0)
+        self.assertEqual(report["changed_files"], ["styles.css"])
+
+        report = sync_static(self.static, self.dest, self.cache, "hardlink")
+        self.assertEqual(report["changed_files"], [])
+
+    def test_file_named_like_a_temporary_file(self):
+        for method in ("copy", "hardlink"):
+            with self.subTest(method=method):
+                dest = self.path(method)
+                self.write(os.path.join(self.static, "styles.css.tmp"), b"not temporary")
+                report = sync_static(self.static, dest, self.cache + method, method)
+                self.assertEqual(report["methods"][method], 3)
+                self.assertEqual(self.read_bytes(os.path.join(dest, "styles.css.tmp")),
+                                 b"not temporary")
+                self.assertEqual(self.read_bytes(os.path.join(dest, "styles.css")), b"body {}")
+
+    def test_auto_falls_back(self):
+        sync_static(self.static, self.dest, self.cache)
+        self.assertEqual(self.read_bytes(os.path.join(self.dest, "styles.css")), b"body {}")
+
+    def test_changed_and_removed(self):
+        self.check_sync("copy")
+        styles = os.path.join(self.static, "styles.css")
+        self.write(styles, b"body { margin: 0 }")
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+        # Pages in the output are not the stage's to remove
+        self.write(os.path.join(self.dest, "index.html"), b"<p>page</p>")
+
+        report = sync_static(self.static, self.dest, self.cache, "copy")
+        self.assertEqual((report["copied"], report["removed"]), (1, 1))
+        self.assertEqual(self.read_bytes(os.path.join(self.dest, "styles.css")), b"body { margin: 0 }")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "logo.png")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_same_bytes_new_mtime(self):
+        self.check_sync("copy")
+        styles = os.path.join(self.static, "styles.css")
+        stat = os.stat(styles)
+        os.utime(styles, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        report = sync_static(self.static, self.dest, self.cache, "copy")
+        self.assertEqual((report["copied"], report["changed_files"]), (0, []))
+        self.assertEqual(os.stat(os.path.join(self.dest, "styles.css")).st_mtime_ns,
+                         stat.st_mtime_ns + 10**9)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.static, self.dest, self.cache, "rsync")
+
+
+if __name__ == "__main__":
+    unittest.main()
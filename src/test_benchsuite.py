@@ -0,0 +1,65 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from benchsuite import compare, run_and_compare, run_suite
+from corpus import generate_corpus
+from main import markdown_to_html_node
+
+
+class TestCorpus(unittest.TestCase):
+    def test_seeded(self):
+        first = generate_corpus(seed=3, scale=0.05)
+        second = generate_corpus(seed=3, scale=0.05)
+        for name in first:
+            self.assertEqual(first[name]["documents"], second[name]["documents"])
+        self.assertNotEqual(
+            generate_corpus(seed=4, scale=0.05)["heavy_inline"]["documents"],
+            first["heavy_inline"]["documents"],
+        )
+
+    def test_documents_parse(self):
+        corpus = generate_corpus(seed=1, scale=0.05)
+        self.assertEqual(
+            set(corpus),
+            {"heavy_inline", "deep_nesting", "huge_list", "many_small_pages"},
+        )
+        for workload in corpus.values():
+            for document in workload["documents"]:
+                markdown_to_html_node(document).to_html()
+        corpus["deep_nesting"]["tree"].to_html()
+
+
+class TestBenchSuite(unittest.TestCase):
+    def test_run_suite(self):
+        report = run_suite(seed=0, scale=0.01, repeat=1, workloads=["many_small_pages"])
+        self.assertIn("many_small_pages/ParentNode.to_html", report["results"])
+        for result in report["results"].values():
+            self.assertGreater(result["seconds"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+
+    def test_run_and_compare(self):
+        options = {"scale": 0.01, "repeat": 1, "workloads": ["many_small_pages"]}
+        with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+            results = os.path.join(root, "results.json")
+            self.assertEqual(run_and_compare(output=results, **options), 0)
+            # Anything at all slower than the baseline is a regression
+            self.assertEqual(run_and_compare(baseline=results, threshold=-1, **options), 1)
+
+    def test_compare(self):
+        baseline = {"results": {"a/f": {"seconds": 1.0, "peak_bytes": 100}}}
+        current = {"results": {
+            "a/f": {"seconds": 1.5, "peak_bytes": 100},
+            "b/f": {"seconds": 9.0, "peak_bytes": 900},
+        }}
+        rows = compare(current, baseline, threshold=0.2)
+        self.assertEqual(rows, [
+            ("a/f", "seconds", 1.0, 1.5, 1.5, True),
+            ("a/f", "peak_bytes", 100, 100, 1.0, False),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
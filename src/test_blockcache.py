@@ -0,0 +1,78 @@
+import unittest
+
+from blockcache import BlockCache, parser_version
+from fixtures import TempDirTestCase
+
+
+class TestBlockCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.path("cache", "blocks.sqlite")
+
+    def test_get_put(self):
+        cache = BlockCache(self.db, version="1")
+        self.assertIsNone(cache.get("# Title"))
+        cache.put("# Title", "<h1>Title</h1>")
+        self.assertEqual(cache.get("# Title"), "<h1>Title</h1>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+    def test_render(self):
+        cache = BlockCache(self.db, version="1")
+        calls = []
+
+        def render_block(block):
+            calls.append(block)
+            return f"<p>{block}</p>"
+
+        self.assertEqual(cache.render("text", render_block), "<p>text</p>")
+        self.assertEqual(cache.render("text", render_block), "<p>text</p>")
+        self.assertEqual(calls, ["text"])
+        cache.close()
+
+    def test_persistent(self):
+        cache = BlockCache(self.db, version="1")
+        cache.put("text", "<p>text</p>")
+        cache.close()
+
+        cache = BlockCache(self.db, version="1")
+        self.assertEqual(cache.get("text"), "<p>text</p>")
+        cache.close()
+
+    def test_version_change_invalidates(self):
+        cache = BlockCache(self.db, version="1")
+        cache.put("text", "<p>text</p>")
+        cache.close()
+
+        cache = BlockCache(self.db, version="2")
+        self.assertIsNone(cache.get("text"))
+        self.assertEqual(cache.count(), 0)
+        cache.close()
+
+    def test_lru_eviction(self):
+        cache = BlockCache(self.db, max_entries=2, version="1")
+        cache.put("a", "A")
+        cache.flush()
+        cache.put("b", "B")
+        cache.flush()
+        # Reading "a" makes "b" the least recently used
+        cache.get("a")
+        cache.flush()
+        cache.put("c", "C")
+        cache.flush()
+        # Flushing alone never evicts
+        self.assertEqual(cache.count(), 3)
+        cache.evict()
+        self.assertEqual(cache.count(), 2)
+        self.assertEqual(cache.get("a"), "A")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "C")
+        cache.close()
+
+    def test_parser_version(self):
+        self.assertEqual(parser_version(), parser_version())
+        self.assertEqual(len(parser_version()), 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -77,5 +77,18 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "   \n  \n    "
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_long_ordered_list(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 1001))
+        self.assertEqual(block_to_block_type(block), BlockType.OLIST)
+        self.assertEqual(block_to_block_type(block + "\n1002. item"), BlockType.PARAGRAPH)
+
+    def test_quote_with_plain_last_line(self):
+        block = "> quoted\n> lines\nnot quoted"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_hashes_only_block(self):
+        block = "###"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
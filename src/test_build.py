@@ -0,0 +1,220 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from build import build_site, find_markdown_files, page_output_path, pool_size, render_pages, STAGES
+from fixtures import TempDirTestCase
+from template import Template
+
+
+class TestBuildSite(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.dest = self.path("public")
+        self.template = self.path("template.html")
+        self.write(self.template, "<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **home**")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\n- one\n- two")
+        self.write(os.path.join(self.content, "notes.txt"), "not markdown")
+
+    def test_find_markdown_files(self):
+        self.assertEqual(
+            find_markdown_files(self.content),
+            ["index.md", os.path.join("blog", "post", "index.md")],
+        )
+
+    def test_page_output_path(self):
+        self.assertEqual(
+            page_output_path("public", os.path.join("blog", "index.md")),
+            os.path.join("public", "blog", "index.html"),
+        )
+
+    def check_output(self, report):
+        self.assertEqual(report["pages"], 2)
+        self.assertEqual(set(report["timings"]), set(STAGES))
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "index.html")),
+            "<title>Home</title><main><div><h1>Home</h1><p>Welcome <b>home</b></p></div></main>",
+        )
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "blog", "post", "index.html")),
+            "<title>Post</title><main><div><h1>Post</h1><ul><li>one</li><li>two</li></ul></div></main>",
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "notes.html")))
+
+    def test_build_in_process(self):
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual(report["workers"], 1)
+        self.check_output(report)
+
+    def test_build_process_pool(self):
+        report = build_site(self.content, self.template, self.dest, workers=2)
+        self.assertEqual(report["workers"], 2)
+        self.check_output(report)
+
+    def test_incremental_build(self):
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"], report["removed"]), (2, 0, 0))
+
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"], report["removed"]), (0, 2, 0))
+
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"], report["removed"]), (1, 1, 0))
+        self.assertIn("<p>Changed</p>", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_changed_files(self):
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual(report["changed_files"],
+                         ["index.html", os.path.join("blog", "post", "index.html")])
+
+        # Rebuilt, but the page comes out the same
+        index = os.path.join(self.dest, "index.html")
+        mtime = os.stat(index).st_mtime_ns - 10**9
+        os.utime(index, ns=(mtime, mtime))
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n\nWelcome **home**\n")
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["unchanged"]), (1, 1))
+        self.assertEqual(report["changed_files"], [])
+        self.assertEqual(report["removed_files"], [os.path.join("blog", "post", "index.html")])
+        self.assertEqual(os.stat(index).st_mtime_ns, mtime)
+
+    def test_output_hash_checks_output_size(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        # The page's hash still matches the last build, but the file on disk
+        # was changed since, so it's written again
+        index = os.path.join(self.dest, "index.html")
+        self.write(index, "edited by hand")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **home**\n")
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual(report["changed_files"], ["index.html"])
+        self.assertIn("<h1>Home</h1>", self.read(index))
+
+    def test_incremental_build_replaced_output(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        # Put back by hand, e.g. by a checkout, with the source unchanged
+        index = os.path.join(self.dest, "index.html")
+        self.write(index, "stale")
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (1, 1))
+        self.assertEqual(report["changed_files"], ["index.html"])
+        self.assertIn("<h1>Home</h1>", self.read(index))
+
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (0, 2))
+
+    def test_incremental_build_removes_deleted_pages(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"], report["removed"]), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post", "index.html")))
+
+    def test_incremental_build_template_change(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (2, 0))
+
+    def test_incremental_build_missing_output(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        os.remove(os.path.join(self.dest, "index.html"))
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (1, 1))
+
+    def test_force_build(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        report = build_site(self.content, self.template, self.dest, workers=1, force=True)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (2, 0))
+
+    def test_parser_change_rebuilds(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        with patch("build.parser_version", return_value="changed"):
+            report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (2, 0))
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (2, 0))
+
+    def test_missing_title_names_the_page(self):
+        source = os.path.join(self.content, "untitled.md")
+        self.write(source, "No heading here")
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                with self.assertRaisesRegex(Exception, "untitled.md: No title found"):
+                    build_site(self.content, self.template, self.dest, workers=workers)
+
+    def test_force_build_removes_deleted_pages(self):
+        build_site(self.content, self.template, self.dest, workers=1)
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        report = build_site(self.content, self.template, self.dest, workers=1, force=True)
+        self.assertEqual((report["rebuilt"], report["removed"]), (1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post", "index.html")))
+
+    def test_block_cache(self):
+        report = build_site(self.content, self.template, self.dest, workers=1)
+        self.assertEqual((report["cache_hits"], report["cache_misses"]), (0, 4))
+
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        report = build_site(self.content, self.template, self.dest, workers=2, force=True)
+        self.assertEqual((report["cache_hits"], report["cache_misses"]), (3, 1))
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "index.html")),
+            "<title>Home</title><main><div><h1>Home</h1><p>Changed</p></div></main>",
+        )
+
+    def test_no_block_cache(self):
+        report = build_site(self.content, self.template, self.dest, workers=1, block_cache=False)
+        self.assertEqual((report["cache_hits"], report["cache_misses"]), (0, 0))
+        self.check_output(report)
+
+
+class TestRenderPages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.sources, self.dests = [], []
+        for i in range(10):
+            source = self.path(f"page{i}.md")
+            self.write(source, f"# Page {i}" + "\n\ntext" * i)
+            self.sources.append(source)
+            self.dests.append(self.path("public", f"page{i}.html"))
+
+    def check_pages(self, results, written=True):
+        self.assertEqual(len(results), 10)
+        for i, dest in enumerate(self.dests):
+            self.assertEqual(self.read(dest).count("<p>text</p>"), i)
+        self.assertEqual([result["written"] for result in results], [written] * 10)
+
+    def test_pool_size(self):
+        self.assertEqual(pool_size(4, 2), 2)
+        self.assertEqual(pool_size(4, 0), 1)
+        self.assertEqual(pool_size(0, 5), 1)
+        self.assertGreaterEqual(pool_size(None, 100), 1)
+
+    def test_in_process(self):
+        self.check_pages(render_pages(self.sources, self.dests, self.template, workers=1))
+
+    def test_unchanged_pages_not_written(self):
+        render_pages(self.sources, self.dests, self.template, workers=1)
+        mtime = os.stat(self.dests[3]).st_mtime_ns
+        os.utime(self.dests[3], ns=(mtime - 10**9, mtime - 10**9))
+        self.check_pages(render_pages(self.sources, self.dests, self.template, workers=1),
+                         written=False)
+        self.assertEqual(os.stat(self.dests[3]).st_mtime_ns, mtime - 10**9)
+
+    def test_chunked_pool(self):
+        self.check_pages(render_pages(self.sources, self.dests, self.template, workers=2,
+                                      chunksize=3, concurrency=2))
+
+    def test_memory_limit(self):
+        # A limit always renders in a worker process, never capping this one
+        results = render_pages(self.sources, self.dests, self.template, workers=1,
+                               memory_limit=2 * 1024 ** 3)
+        self.check_pages(results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import gzip
+import os
+import unittest
+
+from compress import compress_outputs, find_compressible
+from fixtures import TempDirTestCase
+
+
+class TestCompressOutputs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = self.path("public")
+        self.cache = self.path(".build-cache")
+        self.page = b"<p>" + b"compressible text " * 200 + b"</p>"
+        self.write(os.path.join(self.dest, "index.html"), self.page)
+        self.write(os.path.join(self.dest, "blog", "post.html"), self.page)
+        self.write(os.path.join(self.dest, "styles.css"), b"body {}")
+        self.write(os.path.join(self.dest, "logo.png"), b"\x89PNG" * 1000)
+
+    def compress(self, **kwargs):
+        return compress_outputs(self.dest, self.cache, brotli_quality=None, **kwargs)
+
+    def test_find_compressible(self):
+        self.assertEqual(find_compressible(self.dest),
+                         ["index.html", "styles.css", os.path.join("blog", "post.html")])
+
+    def test_compress(self):
+        report = self.compress()
+        self.assertEqual((report["files"], report["compressed"], report["too_small"]), (3, 2, 1))
+        self.assertLess(report["bytes_out"], report["bytes_in"])
+        self.assertEqual(sorted(report["changed_files"]),
+                         ["blog/post.html.gz".replace("/", os.sep), "index.html.gz"])
+        with gzip.open(os.path.join(self.dest, "index.html.gz")) as f:
+            self.assertEqual(f.read(), self.page)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "styles.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "logo.png.gz")))
+
+    def test_unchanged_skipped(self):
+        self.compress()
+        report = self.compress()
+        self.assertEqual((report["compressed"], report["skipped"]), (0, 2))
+
+        self.write(os.path.join(self.dest, "index.html"), self.page + b"<p>more</p>")
+        report = self.compress()
+        self.assertEqual((report["compressed"], report["skipped"]), (1, 1))
+        with gzip.open(os.path.join(self.dest, "index.html.gz")) as f:
+            self.assertEqual(f.read(), self.page + b"<p>more</p>")
+
+    def test_level_change_recompresses(self):
+        self.compress(gzip_level=1)
+        report = self.compress(gzip_level=9)
+        self.assertEqual(report["compressed"], 2)
+
+    def test_removed_outputs(self):
+        self.compress()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.write(os.path.join(self.dest, "blog", "post.html"), b"<p>short</p>")
+        report = self.compress()
+        self.assertEqual(sorted(report["removed_files"]),
+                         ["blog/post.html.gz".replace("/", os.sep), "index.html.gz"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post.html.gz")))
+
+    def test_deterministic(self):
+        self.compress()
+        with open(os.path.join(self.dest, "index.html.gz"), "rb") as f:
+            first = f.read()
+        self.compress(gzip_level=8)
+        self.compress(gzip_level=9)
+        with open(os.path.join(self.dest, "index.html.gz"), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -169,3 +169,48 @@ class TestImageAndLinkSplit(unittest.TestCase):
             [TextNode("link", TextType.LINK, "https://example.com")],
             new_nodes
         )
+
+    def test_split_links_same_markdown_as_image(self):
+        """Test that a link is not split out of an identical image"""
+        node = TextNode("![x](https://example.com) and [x](https://example.com)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertListEqual(
+            [
+                TextNode("![x](https://example.com) and ", TextType.TEXT),
+                TextNode("x", TextType.LINK, "https://example.com"),
+            ],
+            new_nodes
+        )
+
+    def test_split_image_link(self):
+        """Test the single pass splitter for images and links"""
+        node = TextNode(
+            "An ![image](https://example.com/img.png) and a [link](https://example.com) end",
+            TextType.TEXT,
+        )
+        new_nodes = split_nodes_image_link([node])
+        self.assertListEqual(
+            [
+                TextNode("An ", TextType.TEXT),
+                TextNode("image", TextType.IMAGE, "https://example.com/img.png"),
+                TextNode(" and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://example.com"),
+                TextNode(" end", TextType.TEXT),
+            ],
+            new_nodes
+        )
+
+    def test_split_image_link_matches_two_passes(self):
+        """Test the single pass splitter against image then link splitting"""
+        texts = [
+            "This is text with no links",
+            "[link](https://example.com)![image](https://example.com/img.png)",
+            "[t](x![a)](v)",
+            "",
+        ]
+        for text in texts:
+            nodes = [TextNode(text, TextType.TEXT), TextNode("bold", TextType.BOLD)]
+            self.assertListEqual(
+                split_nodes_link(split_nodes_image(nodes)),
+                split_nodes_image_link(nodes),
+            )
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, Props, escape_attribute
 
 class TestHTMLNode(unittest.TestCase):
     def test_node_attributes(self):
@@ -35,6 +36,14 @@ class TestHTMLNode(unittest.TestCase):
         self.assertNotEqual(node.tag, node2.tag)
         self.assertNotEqual(node3.children[0], node3.children[1])
 
+    def test_no_instance_dict(self):
+        for node in [HTMLNode(), LeafNode("p", "text"), ParentNode("div", [])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_repr(self):
+        node = LeafNode("a", "link", {"href": "https://www.google.com"})
+        self.assertEqual(repr(node), "HTMLNode(a, link, None, {'href': 'https://www.google.com'})")
+
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_p(self):
         node = LeafNode("p", "Hello, world!")
@@ -154,5 +163,95 @@ class TestParentNode(unittest.TestCase):
             "<div><p><em><b>Level 4</b></em><span>Sibling at level 3</span></p></div>"
         )
 
+    def test_to_html_very_deep_tree(self):
+        """Test that depth is not limited by the recursion limit"""
+        depth = 100000
+        node = LeafNode("b", "deep")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertEqual(html, "<div>" * depth + "<b>deep</b>" + "</div>" * depth)
+
+    def test_to_html_deep_tree_missing_children(self):
+        node = ParentNode("span", None)
+        for _ in range(3):
+            node = ParentNode("div", [node])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+class TestProps(unittest.TestCase):
+    def test_props_cached(self):
+        node = LeafNode("a", "link", Props({"href": "https://www.google.com"}))
+        self.assertEqual(node.props_to_html(), ' href="https://www.google.com"')
+        self.assertIs(node.props_to_html(), node.props_to_html())
+
+    def test_props_invalidated_on_change(self):
+        node = LeafNode("a", "link", Props({"href": "https://www.google.com"}))
+        node.to_html()
+        node.props["target"] = "_blank"
+        self.assertEqual(node.to_html(), '<a href="https://www.google.com" target="_blank">link</a>')
+        del node.props["href"]
+        self.assertEqual(node.to_html(), '<a target="_blank">link</a>')
+        node.props.update(id="main")
+        self.assertEqual(node.to_html(), '<a target="_blank" id="main">link</a>')
+        node.props = {"href": "/"}
+        self.assertEqual(node.to_html(), '<a href="/">link</a>')
+        node.props = None
+        self.assertEqual(node.to_html(), '<a>link</a>')
+
+    def test_props_escaped(self):
+        node = ParentNode("div", [], {"title": 'say "hi" & <go>'})
+        self.assertEqual(
+            node.to_html(),
+            '<div title="say &quot;hi&quot; &amp; &lt;go&gt;"></div>',
+        )
+
+    def test_escape_attribute_fast_path(self):
+        value = "https://www.google.com"
+        self.assertIs(escape_attribute(value), value)
+        self.assertEqual(escape_attribute("a&b"), "a&amp;b")
+        self.assertEqual(escape_attribute(None), "None")
+
+    def test_plain_props_kept(self):
+        # The caller's dict is used as it is, and changes to it show up
+        props = {"href": "https://www.google.com"}
+        node = LeafNode("a", "link", props)
+        self.assertIs(node.props, props)
+        node.to_html()
+        props["href"] = "/"
+        self.assertEqual(node.to_html(), '<a href="/">link</a>')
+
+class TestStreamingHTML(unittest.TestCase):
+    def setUp(self):
+        self.node = ParentNode("div", [
+            LeafNode("span", "Text node"),
+            ParentNode("ul", [LeafNode("li", "Item 1")], {"class": "list"}),
+            LeafNode(None, "raw text"),
+        ])
+        self.expected = '<div><span>Text node</span><ul class="list"><li>Item 1</li></ul>raw text</div>'
+
+    def test_iter_html(self):
+        self.assertEqual("".join(self.node.iter_html()), self.expected)
+
+    def test_write_html_to_file(self):
+        sink = io.StringIO()
+        self.node.write_html(sink)
+        self.assertEqual(sink.getvalue(), self.expected)
+
+    def test_write_html_to_list(self):
+        chunks = []
+        self.node.write_html(chunks)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), self.expected)
+
+    def test_write_html_leaf(self):
+        chunks = []
+        LeafNode("b", "bold").write_html(chunks)
+        self.assertEqual(chunks, ["<b>bold</b>"])
+
+    def test_write_html_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "text").write_html([])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+import unittest
+
+import instrument
+import main
+from build import build_site
+from fixtures import TempDirTestCase
+from htmlnode import LeafNode, ParentNode
+from instrument import Profiler, profiling
+
+
+class TestInstrument(unittest.TestCase):
+    def test_profiling_counts_calls(self):
+        profiler = Profiler()
+        original = main.markdown_to_blocks
+        with profiling(profiler):
+            self.assertIsNot(main.markdown_to_blocks, original)
+            main.markdown_to_html_node("# Title\n\nSome **bold** text").to_html()
+        self.assertIs(main.markdown_to_blocks, original)
+        self.assertIsNone(instrument.active)
+
+        stats = profiler.stats
+        self.assertEqual(stats["main.markdown_to_blocks"][0], 1)
+        self.assertEqual(stats["main.block_to_html_node"][0], 2)
+        self.assertEqual(stats["main.text_to_textnodes"][0], 2)
+        calls, seconds, size = stats["htmlnode.ParentNode.to_html"]
+        self.assertEqual(calls, 1)
+        self.assertGreaterEqual(seconds, 0)
+        self.assertEqual(size, len("<div><h1>Title</h1><p>Some <b>bold</b> text</p></div>"))
+
+    def test_not_recording_when_off(self):
+        profiler = Profiler()
+        with profiling(profiler):
+            pass
+        ParentNode("p", [LeafNode(None, "text")]).to_html()
+        self.assertEqual(profiler.stats, {})
+
+    def test_drain_and_merge(self):
+        worker = Profiler(per_page=True, trace=True)
+        with worker.current_page("a.md"):
+            worker.record("stage", 1.0, 1.5, 10)
+        data = worker.drain()
+        self.assertEqual(worker.stats, {})
+
+        profiler = Profiler()
+        profiler.merge(data)
+        profiler.merge(data)
+        self.assertEqual(profiler.stats["stage"], [2, 1.0, 20])
+        self.assertEqual(profiler.pages["a.md"]["stage"], [2, 1.0, 20])
+        self.assertEqual(len(profiler.events), 4)
+
+
+    def test_record_from_threads(self):
+        profiler = Profiler(per_page=True)
+
+        def record(page):
+            with profiler.on_page(page):
+                for _ in range(1000):
+                    profiler.record("stage", 0.0, 1.0)
+
+        threads = [threading.Thread(target=record, args=(f"{i}.md",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(profiler.stats["stage"][0], 8000)
+        self.assertEqual({stats["stage"][0] for stats in profiler.pages.values()}, {1000})
+        self.assertIsNone(profiler.page)
+
+
+class TestBuildProfiling(TempDirTestCase):
+    def test_build_profile_and_trace(self):
+        content = self.path("content")
+        for name in ("a", "b", "c"):
+            self.write(os.path.join(content, f"{name}.md"), f"# {name}\n\ntext")
+        template = self.path("template.html")
+        self.write(template, "{{ Title }}{{ Content }}")
+
+        for workers in (1, 2):
+            profiler = Profiler(per_page=True, trace=True)
+            build_site(content, template, self.path("public"), workers=workers,
+                       force=True, profiler=profiler)
+            self.assertEqual(profiler.stats["page"][0], 3)
+            self.assertEqual(profiler.stats["build.read_source"][0], 3)
+            self.assertEqual(profiler.stats["output.write_if_changed"][0], 3)
+            self.assertEqual(len(profiler.pages), 3)
+            # Writes run in the output stage's threads, but count for their page
+            for stats in profiler.pages.values():
+                self.assertEqual(stats["output.write_if_changed"][0], 1)
+
+            trace = self.path("trace.json")
+            profiler.write_trace(trace)
+            events = json.loads(self.read(trace))["traceEvents"]
+            self.assertTrue(all(event["ph"] == "X" for event in events))
+            self.assertIn("output.write_if_changed", {event["name"] for event in events})
+        self.assertIsNone(instrument.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
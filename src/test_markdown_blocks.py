@@ -1,3 +1,6 @@
+import io
+import os
+import tempfile
 import unittest
 from main import *
 from textnode import *
@@ -94,4 +97,45 @@ class TestMarkdownToBlocks(unittest.TestCase):
             [
                 "- This is a list\n- With several\n- Nested items\n- That are indented",
             ],
-        )
\ No newline at end of file
+        )
+
+class TestIterMarkdownBlocks(unittest.TestCase):
+    documents = [
+        "",
+        "   \n   \n\n    ",
+        "# Title\n\n\nThis is a paragraph with **bold** text.\n\n\n- Item 1\n- Item 2\n",
+        "\n    # A Heading\n\n    Here is some text that\n        spans multiple lines\n\n    Another block follows.\n    ",
+        "a\n \nb\n\n\n\nc",
+        "a\r\n\r\nb\n\n  \n  x  \n  \n",
+        "no trailing newline",
+        "\n\nstarts\n\n\n\n\nwith blank lines\n\n",
+        "unicode é line\n\nüber",
+    ]
+
+    def test_matches_markdown_to_blocks_text(self):
+        for md in self.documents:
+            with self.subTest(md=md):
+                blocks = list(iter_markdown_blocks(io.StringIO(md, newline="\n")))
+                self.assertEqual(blocks, markdown_to_blocks(md))
+
+    def test_matches_markdown_to_blocks_binary(self):
+        for md in self.documents:
+            with self.subTest(md=md):
+                blocks = list(iter_markdown_blocks(io.BytesIO(md.encode("utf-8"))))
+                self.assertEqual(blocks, markdown_to_blocks(md))
+
+    def test_file_blocks(self):
+        md = self.documents[2]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "wb") as f:
+                f.write(md.encode("utf-8"))
+            for use_mmap in (False, True):
+                blocks = list(iter_markdown_file_blocks(path, use_mmap=use_mmap))
+                self.assertEqual(blocks, markdown_to_blocks(md))
+
+    def test_empty_file_mmap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "empty.md")
+            open(path, "wb").close()
+            self.assertEqual(list(iter_markdown_file_blocks(path, use_mmap=True)), [])
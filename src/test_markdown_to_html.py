@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import patch
+
+import main
+from htmlnode import Props
+from main import *
+
+
+class TestMarkdownToHTMLNode(unittest.TestCase):
+    def test_paragraphs(self):
+        md = """
+    This is **bolded** paragraph
+    text in a p
+    tag here
+
+    This is another paragraph with _italic_ text and `code` here
+
+    """
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p>"
+            "<p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_headings(self):
+        md = """
+    # Title
+
+    ### Sub **heading**
+    """
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><h1>Title</h1><h3>Sub <b>heading</b></h3></div>",
+        )
+
+    def test_code_block(self):
+        md = """
+    ```
+    This is text that _should_ remain
+    the **same** even with inline stuff
+    ```
+    """
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_quote(self):
+        md = """
+    > This is a
+    > **quote**
+    """
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><blockquote>This is a <b>quote</b></blockquote></div>",
+        )
+
+    def test_lists(self):
+        md = """
+    - first [link](https://example.com)
+    - _second_
+
+    1. one
+    2. two
+    """
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><ul><li>first <a href="https://example.com">link</a></li><li><i>second</i></li></ul>'
+            "<ol><li>one</li><li>two</li></ol></div>",
+        )
+
+    def test_empty(self):
+        self.assertEqual(markdown_to_html_node("").to_html(), "<div></div>")
+
+
+class TestInlineLeaves(unittest.TestCase):
+    def test_link_props_cached(self):
+        children = text_to_children("see [docs](/docs) and [docs](/docs)")
+        link = children[1]
+        self.assertIs(children[3], link)
+        self.assertIsInstance(link.props, Props)
+        self.assertIsNone(link.props.html)
+        self.assertEqual(link.to_html(), '<a href="/docs">docs</a>')
+        self.assertEqual(link.props.html, ' href="/docs"')
+        self.assertIs(link.props_to_html(), link.props_to_html())
+
+
+class TestClassifyBlock(unittest.TestCase):
+    def test_heading_level(self):
+        self.assertEqual(classify_block("### Title"), (BlockType.HEADING, 3))
+
+    def test_ordered_list_lines(self):
+        self.assertEqual(
+            classify_block("1. one\n2. two"),
+            (BlockType.OLIST, ["1. one", "2. two"]),
+        )
+
+    def test_long_ordered_list(self):
+        # Past the longest run of prefixes kept formatted
+        with patch("main.MAX_ORDERED_ITEM_PREFIXES", 64), patch("main.ORDERED_ITEM_PREFIXES", ()):
+            block = "\n".join(f"{i}. item" for i in range(1, 151))
+            self.assertEqual(classify_block(block)[0], BlockType.OLIST)
+            self.assertLessEqual(len(main.ORDERED_ITEM_PREFIXES), 64)
+            for wrong in ("151. ", "0150. ", "١٥٠. ", "150 "):
+                with self.subTest(wrong=wrong):
+                    broken = block.replace("150. ", wrong)
+                    self.assertEqual(classify_block(broken)[0], BlockType.PARAGRAPH)
+            html = markdown_to_html_node(block).to_html()
+            self.assertTrue(html.endswith("<li>item</li></ol></div>"))
+            self.assertEqual(html.count("<li>item</li>"), 150)
+
+    def test_other_types(self):
+        self.assertEqual(classify_block("```\ncode\n```"), (BlockType.CODE, None))
+        self.assertEqual(classify_block("> quote"), (BlockType.QUOTE, None))
+        self.assertEqual(classify_block("- item"), (BlockType.ULIST, None))
+        self.assertEqual(classify_block("1. one\n3. three"), (BlockType.PARAGRAPH, None))
+
+    def test_renderer_for_every_type(self):
+        self.assertEqual(set(BLOCK_RENDERERS), set(BlockType))
+
+    def test_code_block_skips_inline_parsing(self):
+        node = block_to_html_node("```\n**not bold** [no](link)\n```")
+        self.assertEqual(node.to_html(), "<pre><code>**not bold** [no](link)\n</code></pre>")
+
+
+class TestExtractTitle(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("# Hello  "), "Hello")
+        self.assertEqual(extract_title("Intro\n\n## Sub\n\n# Main title"), "Main title")
+
+    def test_no_title(self):
+        with self.assertRaises(Exception):
+            extract_title("## Not a title\n\nJust text")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from htmlnode import LeafNode, ParentNode
+from output import page_bytes, write_changed_files, write_if_changed, write_pages, write_pages_async
+
+
+class TestOutput(TempDirTestCase):
+    def test_page_bytes(self):
+        node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        self.assertEqual(page_bytes(node.to_html()), b"<p><b>bold</b> text</p>")
+        self.assertEqual(page_bytes(node.iter_html()), b"<p><b>bold</b> text</p>")
+        self.assertEqual(page_bytes(b"raw"), b"raw")
+
+    def test_write_if_changed(self):
+        path = self.path(os.path.join("blog", "index.html"))
+        self.assertEqual(write_if_changed(path, "<p>é</p>"), 9)
+        self.assertEqual(self.read_bytes(path), "<p>é</p>".encode("utf-8"))
+
+        mtime = os.stat(path).st_mtime_ns - 10**9
+        os.utime(path, ns=(mtime, mtime))
+        self.assertIsNone(write_if_changed(path, "<p>é</p>"))
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+        # Same size, different bytes
+        self.assertEqual(write_if_changed(path, "<p>e!</p>"), 9)
+        self.assertEqual(self.read_bytes(path), b"<p>e!</p>")
+        # No temporary files left behind
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["index.html"])
+
+    def test_write_pages(self):
+        pages = [(self.path(f"page{i}.html"), f"<p>{i}</p>") for i in range(20)]
+        self.assertEqual(write_pages(pages, concurrency=3), [8 if i < 10 else 9 for i in range(20)])
+        self.assertEqual(self.read_bytes(self.path("page7.html")), b"<p>7</p>")
+        self.assertEqual(write_pages(pages, concurrency=3), [None] * 20)
+
+    def test_write_pages_async(self):
+        pages = [(self.path("a.html"), "<p>a</p>"), (self.path("b.html"), ["<p>", "b", "</p>"])]
+        self.assertEqual(asyncio.run(write_pages_async(pages)), [8, 8])
+        self.assertEqual(self.read_bytes(self.path("b.html")), b"<p>b</p>")
+
+    def test_write_changed_files(self):
+        path = self.path("changed.json")
+        write_changed_files(path, ["b.html", os.path.join("blog", "a.html")], ["old.css"])
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"changed": ["b.html", "blog/a.html"],
+                                            "removed": ["old.css"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import re
+import unittest
+
+import patterns
+from patterns import PATTERNS, PATTERN_SOURCES, set_regex_engine
+from main import extract_markdown_images
+
+
+class CountingEngine:
+    def __init__(self):
+        self.compiled = []
+
+    def compile(self, source):
+        self.compiled.append(source)
+        return re.compile(source)
+
+
+class TestPatterns(unittest.TestCase):
+    def test_all_patterns_compiled(self):
+        self.assertEqual(set(PATTERNS), set(PATTERN_SOURCES))
+        for name, pattern in PATTERNS.items():
+            self.assertEqual(pattern.pattern, PATTERN_SOURCES[name])
+
+    def test_set_regex_engine(self):
+        engine = CountingEngine()
+        previous = set_regex_engine(engine)
+        try:
+            self.assertIs(patterns.regex_engine, engine)
+            self.assertCountEqual(engine.compiled, PATTERN_SOURCES.values())
+            self.assertListEqual(
+                [("image", "https://example.com/img.png")],
+                extract_markdown_images("An ![image](https://example.com/img.png)"),
+            )
+        finally:
+            set_regex_engine(previous)
+        self.assertIs(patterns.regex_engine, re)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -38,4 +38,19 @@ class TestSplitNode(unittest.TestCase):
         self.assertEqual(new_nodes[3].text, "words")
         self.assertEqual(new_nodes[3].text_type, TextType.BOLD)
         self.assertEqual(new_nodes[4].text, "")
-        self.assertEqual(new_nodes[4].text_type, TextType.TEXT)
\ No newline at end of file
+        self.assertEqual(new_nodes[4].text_type, TextType.TEXT)
+
+    def test_split_nodes_delimiter_many_pairs(self):
+        # Must not recurse once per delimiter pair
+        count = 100000
+        node = TextNode("a **b** " * count, TextType.TEXT)
+        new_nodes = split_nodes_delimiter([node], "**", TextType.BOLD)
+        self.assertEqual(len(new_nodes), 2 * count + 1)
+        self.assertEqual(new_nodes[0], TextNode("a ", TextType.TEXT))
+        self.assertEqual(new_nodes[1], TextNode("b", TextType.BOLD))
+        self.assertEqual(new_nodes[-1], TextNode(" ", TextType.TEXT))
+
+    def test_split_nodes_delimiter_unclosed(self):
+        node = TextNode("This is **bold** and **broken", TextType.TEXT)
+        with self.assertRaises(Exception):
+            split_nodes_delimiter([node], "**", TextType.BOLD)
@@ -0,0 +1,53 @@
+import pickle
+import unittest
+
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_pieces(self):
+        template = Template("<title>{{ Title }}</title>{{Content}}")
+        self.assertEqual(template.pieces, [
+            ("<title>", "Title", "{{ Title }}"),
+            ("</title>", "Content", "{{Content}}"),
+            ("", None, None),
+        ])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>hi</p>"}),
+            "<title>Home</title><main><p>hi</p></main>",
+        )
+
+    def test_render_chunks(self):
+        template = Template("<main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render({"Content": ["<div>", "<p>hi</p>", "</div>"]}),
+            "<main><div><p>hi</p></div></main>",
+        )
+
+    def test_values_are_not_rescanned(self):
+        # A title that looks like a slot stays as written
+        template = Template("{{ Title }}|{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "{{ Content }}", "Content": "body"}),
+            "{{ Content }}|body",
+        )
+
+    def test_missing_value_keeps_slot(self):
+        template = Template("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home {{ Footer }}")
+
+    def test_no_slots(self):
+        self.assertEqual(Template("<p>static</p>").render({}), "<p>static</p>")
+
+    def test_pickle(self):
+        template = Template("<h1>{{ Title }}</h1>")
+        copy = pickle.loads(pickle.dumps(template))
+        self.assertEqual(copy.pieces, template.pieces)
+        self.assertEqual(copy.render({"Title": "x"}), "<h1>x</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
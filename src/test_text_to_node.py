@@ -73,4 +73,53 @@ class TestTextToTextNodes(unittest.TestCase):
         self.assertEqual(nodes[2].text, " with a ")
         self.assertEqual(nodes[3].text, "link")
         self.assertEqual(nodes[3].text_type, TextType.LINK)
-        self.assertEqual(nodes[3].url, "https://example.com")
\ No newline at end of file
+        self.assertEqual(nodes[3].url, "https://example.com")
+
+class TestSinglePassTokenizer(unittest.TestCase):
+    # Inline texts used across the test suite plus a few edge cases
+    corpus = [
+        "Just plain text",
+        "This is **bold** text",
+        "This is _italic_ text",
+        "This has an ![image](https://example.com/img.jpg)",
+        "Visit [my website](https://example.com)",
+        "Use `print()` function",
+        "This is **bold** with a [link](https://example.com)",
+        "This is text with a **bold** word",
+        "This has **two** bold **words**",
+        "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and another ![second image](https://i.imgur.com/3elNhQu.png)",
+        "This is text with a [link](https://example.com) and [another](https://example.org/page)",
+        "![image](https://example.com/img.png)",
+        "[link](https://example.com)",
+        "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+        "**bold**_italic_`code`",
+        "****",
+        "",
+        "a ![img](u) b [l](v) c ![x](y)[z](w)",
+        "**a [l](v) b** and _![i](u)_",
+        "![img](u)[link](v)",
+    ]
+
+    def test_matches_chained_pipeline(self):
+        for text in self.corpus:
+            with self.subTest(text=text):
+                self.assertListEqual(
+                    text_to_textnodes(text),
+                    text_to_textnodes(text, single_pass=True),
+                )
+
+    def test_same_error_as_chained_pipeline(self):
+        # The scan reaches the unclosed ` first, the chain checks _ first
+        for text in ["]`_!# _```(_", "`x _ _y_", "_a_ **b `c` d"]:
+            with self.subTest(text=text):
+                with self.assertRaises(Exception) as chained:
+                    text_to_textnodes(text)
+                with self.assertRaises(Exception) as single:
+                    text_to_textnodes(text, single_pass=True)
+                self.assertEqual(str(single.exception), str(chained.exception))
+
+    def test_unclosed_delimiter_raises(self):
+        for text in ["This is **bold", "an _italic", "some `code"]:
+            with self.subTest(text=text):
+                with self.assertRaises(Exception):
+                    text_to_textnodes(text, single_pass=True)
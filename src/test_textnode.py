@@ -1,7 +1,7 @@
 import unittest
 
 from textnode import TextNode, TextType
-from main import text_node_to_html_node
+from main import text_node_to_html_node, text_nodes_to_html_nodes
 
 
 class TestTextNode(unittest.TestCase):
@@ -72,4 +72,46 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": url, "alt": alt_text})
 
+    def test_invalid_type(self):
+        with self.assertRaises(Exception):
+            text_node_to_html_node(TextNode("x", "bold"))
 
+    def test_batch(self):
+        nodes = [
+            TextNode("plain ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "https://a.com"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "https://b.com"),
+            TextNode("alt", TextType.IMAGE, "https://a.com/i.png"),
+        ]
+        html_nodes = text_nodes_to_html_nodes(nodes)
+        self.assertEqual(
+            [node.to_html() for node in html_nodes],
+            [text_node_to_html_node(node).to_html() for node in nodes],
+        )
+        # Equal text nodes share a leaf, different urls don't
+        self.assertIs(html_nodes[2], html_nodes[4])
+        self.assertIsNot(html_nodes[3], html_nodes[5])
+
+    def test_batch_shared_leaves(self):
+        leaves = {}
+        first = text_nodes_to_html_nodes([TextNode("x", TextType.CODE)], leaves)
+        second = text_nodes_to_html_nodes([TextNode("x", TextType.CODE)], leaves)
+        self.assertIs(first[0], second[0])
+        self.assertIsNot(first[0], text_nodes_to_html_nodes([TextNode("x", TextType.CODE)])[0])
+
+    def test_batch_invalid_type(self):
+        with self.assertRaises(Exception):
+            text_nodes_to_html_nodes([TextNode("x", TextType.TEXT), TextNode("x", "bold")])
+
+
+
+    def test_repr(self):
+        node = TextNode("test link", TextType.LINK, "https://bootdev.com")
+        self.assertEqual(repr(node), "TextNode(test link, link, https://bootdev.com)")
+
+    def test_no_instance_dict(self):
+        node = TextNode("test", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
@@ -0,0 +1,100 @@
+import contextlib
+import io
+import os
+import time
+import unittest
+import urllib.request
+
+from fixtures import TempDirTestCase
+from watch import Watcher, changed_files, pool_context, rebuild, serve, snapshot
+
+
+class TestWatch(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.static = self.path("static")
+        self.dest = self.path("public")
+        self.template = self.path("template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "about.md"), "# About")
+        self.write(os.path.join(self.static, "styles.css"), "body {}")
+
+    def touch(self, path, text):
+        # Moves the mtime forward even on filesystems with coarse timestamps
+        self.write(path, text)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_changed_files(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(changed_files(old, new), {"b", "c", "d"})
+
+    def test_snapshot_missing_path(self):
+        files = snapshot([self.template, self.path("missing")])
+        self.assertEqual(list(files), [self.template])
+
+    def test_wait_coalesces_saves(self):
+        watcher = Watcher([self.content, self.template], interval=0.01, quiet=0.05)
+        self.assertEqual(watcher.wait(timeout=0.05), (set(), None))
+
+        index = os.path.join(self.content, "index.md")
+        self.touch(index, "# Home 1")
+        self.touch(self.template, "{{ Content }}")
+        changed, first_seen = watcher.wait(timeout=1)
+        self.assertEqual(changed, {index, self.template})
+        self.assertLessEqual(first_seen, time.perf_counter())
+
+    def test_rebuild_only_affected_pages(self):
+        options = {"workers": 1}
+        report, assets = rebuild({self.template}, self.content, self.template, self.dest,
+                                 self.static, options)
+        self.assertEqual(report["rebuilt"], 2)
+        self.assertIsNone(assets)
+
+        index = os.path.join(self.content, "index.md")
+        self.touch(index, "# Welcome")
+        report, assets = rebuild({index}, self.content, self.template, self.dest,
+                                 self.static, options)
+        self.assertEqual((report["rebuilt"], report["skipped"]), (1, 1))
+        self.assertEqual(self.read(os.path.join(self.dest, "index.html")),
+                         "<title>Welcome</title><div><h1>Welcome</h1></div>")
+
+        styles = os.path.join(self.static, "styles.css")
+        report, assets = rebuild({styles}, self.content, self.template, self.dest,
+                                 self.static, options)
+        self.assertIsNone(report)
+        self.assertEqual(assets["copied"], 1)
+        self.assertEqual(self.read(os.path.join(self.dest, "styles.css")), "body {}")
+
+        os.remove(styles)
+        rebuild({styles}, self.content, self.template, self.dest, self.static, options)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "styles.css")))
+
+    def test_serve(self):
+        os.makedirs(self.dest)
+        self.write(os.path.join(self.dest, "index.html"), "<p>hi</p>")
+        server = serve(self.dest, port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with urllib.request.urlopen(url) as response:
+                    self.assertEqual(response.read(), b"<p>hi</p>")
+            self.assertEqual(stderr.getvalue(), "")
+
+            # A pool started while the server runs doesn't fork its thread
+            options = {"workers": 2, "mp_context": pool_context()}
+            report, assets = rebuild({self.template}, self.content, self.template, self.dest,
+                                     self.static, options)
+            self.assertEqual(report["rebuilt"], 2)
+            with urllib.request.urlopen(url) as response:
+                self.assertEqual(response.read(),
+                                 b"<title>Home</title><div><h1>Home</h1></div>")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    unittest.main()
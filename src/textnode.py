@@ -1,6 +1,10 @@
 from enum import Enum
 
 class TextType(Enum):
+    # Members are singletons, so hashing by identity is safe and keeps
+    # dict lookups keyed on them out of Python code
+    __hash__ = object.__hash__
+
     TEXT = "normal"
     BOLD = "bold"
     ITALIC = "italic"
@@ -9,6 +13,9 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    # Slots instead of a per-instance __dict__, pages hold many of these
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
             self.text = text
             self.text_type = text_type
@@ -0,0 +1,171 @@
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from assets import sync_static
+from build import build_site, default_cache_dir
+
+# How often the watched files are checked, and how long they have to stay
+# unchanged before a rebuild starts, so that a burst of saves is one rebuild
+POLL_INTERVAL = 0.1
+QUIET_PERIOD = 0.2
+
+
+def snapshot(paths):
+    # {file: (mtime_ns, size)} for every file under paths. A path that does
+    # not exist is left out, so creating it later shows up as a change.
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, dirs, names in os.walk(path):
+            for name in names:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def changed_files(old, new):
+    # Files added, removed or modified between two snapshots
+    changed = {path for path, state in new.items() if old.get(path) != state}
+    changed.update(path for path in old if path not in new)
+    return changed
+
+
+class Watcher:
+    # Polls paths for changes, stdlib only so it works the same everywhere
+    def __init__(self, paths, interval=POLL_INTERVAL, quiet=QUIET_PERIOD):
+        self.paths = paths
+        self.interval = interval
+        self.quiet = quiet
+        self.state = snapshot(paths)
+
+    def poll(self):
+        new = snapshot(self.paths)
+        changed = changed_files(self.state, new)
+        self.state = new
+        return changed
+
+    def wait(self, timeout=None):
+        # Blocks until something changes, then keeps collecting changes until
+        # none arrive for the quiet period. Returns the changed files and the
+        # time the first one was seen, or an empty set after timeout seconds.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = self.poll()
+        while not changed:
+            if deadline is not None and time.monotonic() >= deadline:
+                return set(), None
+            time.sleep(self.interval)
+            changed = self.poll()
+        first_seen = time.perf_counter()
+
+        last_change = time.monotonic()
+        while time.monotonic() - last_change < self.quiet:
+            time.sleep(self.interval)
+            more = self.poll()
+            if more:
+                changed |= more
+                last_change = time.monotonic()
+        return changed, first_seen
+
+
+def in_dir(path, directory):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(directory)]) == \
+        os.path.abspath(directory)
+
+
+def rebuild(changed, content_dir, template_path, dest_dir, static_dir, build_options,
+            asset_method="auto"):
+    # Brings dest_dir up to date after changed files. Only pages whose source
+    # changed are re-rendered, except for a template change, which affects
+    # every page; the build manifest works out which. Likewise only changed
+    # static files are copied.
+    report = assets = None
+    if any(not in_dir(path, static_dir) for path in changed):
+        report = build_site(content_dir, template_path, dest_dir, **build_options)
+    if any(in_dir(path, static_dir) for path in changed):
+        assets = sync_static(static_dir, dest_dir, default_cache_dir(dest_dir), asset_method)
+    return report, assets
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    # No line per request on stderr, it would bury the rebuild reports.
+    # Errors are still logged.
+    def log_request(self, code="-", size="-"):
+        pass
+
+
+def serve(directory, host="127.0.0.1", port=8000):
+    # Serves directory over HTTP from a background thread. Files are read on
+    # every request, so rebuilt pages show up on the next refresh.
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def pool_context():
+    # forkserver where there is one, it starts workers faster than spawn
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def watch(content_dir="content", template_path="template.html", dest_dir="public",
+          static_dir="static", host="127.0.0.1", port=8000, force=False, build_options=None,
+          asset_method="auto"):
+    # Builds once, serves dest_dir and rebuilds whenever a watched file
+    # changes, until interrupted. port None skips the server. force only
+    # applies to the first build.
+    build_options = build_options or {}
+    report = build_site(content_dir, template_path, dest_dir, force=force, **build_options)
+    assets = sync_static(static_dir, dest_dir, default_cache_dir(dest_dir), asset_method)
+    print(f"Built {report['pages']} pages in {report['elapsed'] * 1000:.1f} ms and synced "
+          f"{assets['files']} static files in {assets['elapsed'] * 1000:.1f} ms")
+
+    server = None
+    if port is not None:
+        server = serve(dest_dir, host, port)
+        print(f"Serving {dest_dir} at http://{host}:{server.server_address[1]}/")
+        # Forking now would copy the server thread's state mid-request, so
+        # rebuilds start their worker pools from a clean process instead
+        build_options = {**build_options, "mp_context": pool_context()}
+
+    watcher = Watcher([content_dir, template_path, static_dir])
+    print("Watching for changes, press Ctrl+C to stop")
+    try:
+        while True:
+            changed, first_seen = watcher.wait()
+            start = time.perf_counter()
+            try:
+                report, assets = rebuild(changed, content_dir, template_path, dest_dir,
+                                         static_dir, build_options, asset_method)
+            except Exception as e:
+                # A half-written file shouldn't end the session, the next
+                # save triggers another rebuild
+                print(f"Rebuild failed: {e}")
+                continue
+            end = time.perf_counter()
+            rebuilt = report["rebuilt"] if report else 0
+            removed = report["removed"] if report else 0
+            copied = assets["copied"] + assets["removed"] if assets else 0
+            # Latency runs from the first change being seen, so it includes
+            # the time spent waiting for saves to settle
+            print(f"{len(changed)} files changed: {rebuilt} pages rebuilt, {removed} removed, "
+                  f"{copied} static files copied in {(end - start) * 1000:.1f} ms "
+                  f"({(end - first_seen) * 1000:.1f} ms after the first change)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()